@@ -0,0 +1,143 @@
+from typing import Any, Optional
+from dotenv import load_dotenv
+import asyncio
+import os
+import random
+import time
+import httpx
+
+load_dotenv()
+
+AI_SERVER_URL = os.getenv("AI_SERVER_URL", "http://34.64.172.167:8000")
+
+# 커넥션 풀/타임아웃 (캡셔닝·여행기 생성은 오래 걸리므로 read 타임아웃을 길게)
+AI_POOL_SIZE = int(os.getenv("AI_POOL_SIZE", 20))
+AI_CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", 5))
+AI_READ_TIMEOUT = float(os.getenv("AI_READ_TIMEOUT", 300))
+
+# 재시도 (지터가 있는 지수 백오프)
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", 2))
+AI_BACKOFF_BASE = float(os.getenv("AI_BACKOFF_BASE", 0.5))
+AI_BACKOFF_MAX = float(os.getenv("AI_BACKOFF_MAX", 8))
+RETRYABLE_STATUS = {502, 503, 504}
+# 요청이 서버에 전달되지 않은 것이 확실한 오류만 재시도
+# (읽기 타임아웃 등은 서버가 이미 생성 작업을 처리 중일 수 있으므로 다시 보내지 않음)
+RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# 서킷 브레이커: 연속 실패가 임계값을 넘으면 일정 시간 즉시 실패
+AI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", 5))
+AI_CIRCUIT_RESET_TIMEOUT = float(os.getenv("AI_CIRCUIT_RESET_TIMEOUT", 30))
+
+
+class AIServerError(Exception):
+    pass
+
+
+class AICircuitOpenError(AIServerError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    # half_open이면 시험 요청 하나만 통과시키고 True 반환 (결과가 기록될 때까지 나머지는 즉시 실패)
+    def before_call(self) -> bool:
+        state = self.state
+        if state == "open" or (state == "half_open" and self.probing):
+            raise AICircuitOpenError("AI server circuit is open")
+        if state == "half_open":
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        # half_open 상태의 시험 요청이 실패하면 다시 open
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+    # 시험 요청이 성공/실패 기록 없이 끝난 경우 (취소 등) 다음 요청이 다시 시험하도록 풀어 줌
+    def release_probe(self):
+        self.probing = False
+
+
+class AIClient:
+    def __init__(self, base_url: str = AI_SERVER_URL):
+        self.base_url = base_url
+        self.breaker = CircuitBreaker(AI_CIRCUIT_FAILURE_THRESHOLD, AI_CIRCUIT_RESET_TIMEOUT)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=AI_POOL_SIZE, max_keepalive_connections=AI_POOL_SIZE),
+                timeout=httpx.Timeout(AI_READ_TIMEOUT, connect=AI_CONNECT_TIMEOUT),
+            )
+        return self._client
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return random.uniform(0, min(AI_BACKOFF_MAX, AI_BACKOFF_BASE * (2 ** attempt)))
+
+    # AI 서버 API는 GET + JSON 본문 형식
+    async def request(self, path: str, payload: Any) -> Any:
+        last_error: Optional[Exception] = None
+        for attempt in range(AI_MAX_RETRIES + 1):
+            probe = self.breaker.before_call()
+            try:
+                response = await self._get_client().request("GET", path, json=payload)
+            except RETRYABLE_TRANSPORT_ERRORS as e:
+                self.breaker.record_failure()
+                last_error = AIServerError(f"AI API Error: {e!r}")
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                raise AIServerError(f"AI API Error: {e!r}") from e
+            except BaseException:
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            else:
+                # 5xx는 서버 장애로 보고 실패로 기록, 2xx/4xx는 서버가 정상 응답한 것이므로 성공으로 기록
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise AIServerError(f"AI API Error: {response.text}")
+                last_error = AIServerError(f"AI API Error: {response.text}")
+            if attempt < AI_MAX_RETRIES:
+                await asyncio.sleep(self._backoff(attempt))
+        raise last_error
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+
+ai_client = AIClient()
+
+
+async def close_ai_client():
+    await ai_client.close()
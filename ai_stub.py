@@ -0,0 +1,41 @@
+from fastapi import FastAPI, Body
+import asyncio
+import os
+import uvicorn
+
+# 테스트/로컬 실행용 AI 서버 스텁 (AI_SERVER_URL=http://localhost:8001 로 지정해 사용)
+AI_STUB_DELAY = float(os.getenv("AI_STUB_DELAY", 0))
+
+app = FastAPI()
+
+
+@app.get("/select-primary-image")
+async def select_primary_image(payload: dict = Body(...)):
+    await asyncio.sleep(AI_STUB_DELAY)
+    image_list = payload.get("image_list", [])
+    return [
+        {"image_id": item["image_id"], "importance": round(1.0 - i / max(len(image_list), 1), 4)}
+        for i, item in enumerate(image_list)
+    ]
+
+
+@app.get("/generate-caption")
+async def generate_caption(payload: dict = Body(...)):
+    await asyncio.sleep(AI_STUB_DELAY)
+    return [
+        {"image_id": item["image_id"], "caption": f"image {item['image_id']} caption"}
+        for item in payload.get("image_list", [])
+    ]
+
+
+@app.get("/generate-travel-log")
+async def generate_travel_log(payload: dict = Body(...)):
+    await asyncio.sleep(AI_STUB_DELAY)
+    return [
+        {"image_id": item["image_id"], "draft": f"{item.get('location') or '어딘가'}에서의 하루. {item.get('caption') or ''}"}
+        for item in payload.get("image_list", [])
+    ]
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("AI_STUB_PORT", 8001)))
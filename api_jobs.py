@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from starlette import status
+from jobs import get_job_engine, Job, JOB_SUCCEEDED, JOB_FAILED
+
+router = APIRouter()
+
+
+def job_accepted_response(job: Job) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}",
+            "result_url": f"/api/jobs/{job.id}/result",
+        },
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+
+async def get_job_or_404(job_id: str) -> Job:
+    job = await get_job_engine().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job id : {job_id} not found"
+        )
+    return job
+
+
+@router.get(
+    "/api/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="백그라운드 작업 상태 조회",
+    description="작업 상태(queued/running/succeeded/failed)와 진행률을 반환합니다."
+)
+async def get_job_status(job_id: str):
+    return (await get_job_or_404(job_id)).to_dict()
+
+
+@router.get(
+    "/api/jobs/{job_id}/result",
+    status_code=status.HTTP_200_OK,
+    summary="백그라운드 작업 결과 조회",
+    description="완료된 작업의 결과를 반환합니다. 아직 끝나지 않은 작업은 202를 반환합니다."
+)
+async def get_job_result(job_id: str):
+    job = await get_job_or_404(job_id)
+    if job.status == JOB_SUCCEEDED:
+        return {"job_id": job.id, "status": job.status, "result": job.result}
+    if job.status == JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job.error
+        )
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+    })
+
+
+@router.get(
+    "/api/metrics/jobs",
+    status_code=status.HTTP_200_OK,
+    summary="백그라운드 작업 지표 확인",
+    description="작업 종류별 워커 수와 처리 건수를 반환합니다."
+)
+async def get_job_metrics():
+    return get_job_engine().metrics()
@@ -1,41 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, conlist, conint
-from typing import Annotated, List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Purpose, TravelQuestionResponse, Travelogue, Image, TravelogueImage, Metadata
 from database import SessionLocal
-from starlette import status
 from datetime import datetime
-from sqlalchemy import or_
-from gcs_utils import generate_signed_url, extract_gcs_file_name, extract_datetime_location_from_gcs, extract_created_at_from_gcs, upload_pdf_and_generate_url, bucket, BUCKET_NAME
-from google.cloud import storage
-import exifread
-import io
-import requests
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderUnavailable
+from sqlalchemy import select
+from gcs_utils import generate_signed_url, generate_signed_urls, extract_gcs_file_name, extract_datetime_location_from_gcs, blob_exists, read_blob
+from storage_backends import StorageNotFound
+import asyncio
+import logging
+import time
+from ai_client import ai_client
+from jobs import job_engine, ProgressCallback, no_progress
+from api_jobs import job_accepted_response
+from geocode_utils import reverse_geocode_points, get_geocode_cache_metrics
+from export_cache import export_fingerprint, export_pdf_name, open_cached_export, store_export, record_export_render, ExportSpool
+from pdf_stream import StreamingPDFWriter
 import os
+import tempfile
 from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
-from PIL import Image as PILImage, ExifTags
+from capture_index import time_ordered_images, order_image_ids_by_capture, set_captured_at
+from image_repository import load_active_images
+from text_layout import get_pdf_font, get_glyph_widths, wrap_text, font_path_full
+from image_prep import get_image_prep_executor, prepare_for_pdf, prepare_jpeg_for_pdf, jpeg_passthrough, pdf_target_pixels, image_uri_for, IMAGE_PREP_WORKERS, PDF_IMAGE_MODE
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+import itertools
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 class TravelPurposeQuestionRequest(BaseModel):
     who_category: conlist(conint(ge=1, le=6), min_length=1, max_length=6)
@@ -57,7 +61,7 @@ async def create_purpose_and_question(
     request: TravelPurposeQuestionRequest,
     db: db_dependency
 ):
-    travelogue = db.get(Travelogue, travelogue_id)
+    travelogue = await db.get(Travelogue, travelogue_id)
     if not travelogue:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,7 +78,7 @@ async def create_purpose_and_question(
                 purpose_category=category_id
             )
             db.add(new_purpose)
-            db.flush()
+            await db.flush()
             purpose_list.append({
                 "id": new_purpose.id,
                 "travelogue_id": new_purpose.travelogue_id,
@@ -87,14 +91,14 @@ async def create_purpose_and_question(
                 who_category=who_id
             )
             db.add(new_question)
-            db.flush()
+            await db.flush()
             question_list.append({
                 "id": new_question.id,
                 "travelogue_id": new_question.travelogue_id,
                 "who_category": new_question.who_category
             })
 
-        db.commit()
+        await db.commit()
 
         return {
             "purpose_list": purpose_list,
@@ -102,13 +106,13 @@ async def create_purpose_and_question(
         }
 
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Database constraint violated"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -133,27 +137,6 @@ class ImageIdsRequest(BaseModel):
     image_ids: Optional[List[int]] = None
 
 
-def convert_to_degrees(value):
-    d = float(value.values[0].num) / float(value.values[0].den)
-    m = float(value.values[1].num) / float(value.values[1].den)
-    s = float(value.values[2].num) / float(value.values[2].den)
-    return d + (m / 60.0) + (s / 3600.0)
-
-geolocator = Nominatim(user_agent="your_app_name", timeout=600)
-
-def reverse_geocode(lat: float, lon: float) -> str: 
-    try:
-        location = geolocator.reverse((lat, lon), language='ko')
-        if location and location.address:
-            return location.address
-        else:
-            return "주소 정보 없음"
-    except GeocoderUnavailable:
-        return "주소 정보 없음"
-    except Exception:
-        return "주소 정보 없음"
-    
-
 @router.post(
     "/api/image/{travelogue_id}/selection/second",
     status_code=status.HTTP_201_CREATED,
@@ -164,15 +147,15 @@ def reverse_geocode(lat: float, lon: float) -> str:
 async def select_second_image(
     travelogue_id: int,
     request: ImageIdsRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    background: bool = Query(False, description="true이면 작업 id를 즉시 반환하고 백그라운드에서 처리"),
+    db: AsyncSession = Depends(get_db)
 ):
     image_ids = request.image_ids
-    caption_list = []
-    metadata_list = []
 
     try:
         if image_ids:
-            images_to_update = db.query(Image).filter(Image.id.in_(image_ids)).all()
+            images_to_update = (await db.scalars(select(Image).where(Image.id.in_(image_ids)))).all()
             if not images_to_update:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -181,156 +164,238 @@ async def select_second_image(
             for img in images_to_update:
                 img.is_in_travelogue = False
             try:
-                db.commit()
+                await db.commit()
             except Exception as e:
-                db.rollback()
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"이미지 비활성화 중 오류 발생: {str(e)}"
                 )
 
-        mappings = db.query(TravelogueImage).filter(
+        mapping = (await db.scalars(select(TravelogueImage).where(
             TravelogueImage.travelogue_id == travelogue_id
-        ).all()
-        if not mappings:
+        ).limit(1))).first()
+        if not mapping:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Travelogue id : {travelogue_id} not found"
             )
 
-        image_ids_valid = [m.image_id for m in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids_valid),
-            Image.is_in_travelogue == True
-        ).all()
+        if background:
+            job = await job_engine.submit("second_selection", travelogue_id=travelogue_id)
+            return job_accepted_response(job)
+
+        result, stage_timings = await run_second_selection(db, travelogue_id)
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={duration:.1f}" for name, duration in stage_timings.items()
+        )
+        return result
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+@job_engine.handler("second_selection", concurrency=4)
+async def second_selection_job(db: AsyncSession, progress: ProgressCallback, travelogue_id: int):
+    result, _ = await run_second_selection(db, travelogue_id, progress)
+    return result
+
+
+# 캡셔닝과 메타데이터 추출을 동시에 수행하고 결과를 한 번에 저장
+async def run_second_selection(db: AsyncSession, travelogue_id: int, progress: ProgressCallback = no_progress):
+    caption_list = []
+    metadata_list = []
+
+    # 업로드 시점에 저장된 메타데이터도 함께 로드
+    images = await load_active_images(db, travelogue_id, with_metadata=True) or []
+
+    stage_timings = {}
 
-        # 3. AI 캡셔닝 요청 데이터 생성
+    async def timed_stage(name, coro):
+        started = time.perf_counter()
+        try:
+            result = await coro
+        finally:
+            stage_timings[name] = (time.perf_counter() - started) * 1000
+        await progress(0.4 * len(stage_timings), name)
+        return result
+
+    # 3~4. AI 캡셔닝 단계
+    async def caption_stage():
+        signed_urls = await generate_signed_urls([image_uri_for(img, "ai") for img in images])
         ai_request_data = {"image_list": [
-            {"image_id": img.id, "image_url": generate_signed_url(img.uri)} for img in images
+            {"image_id": img.id, "image_url": url} for img, url in zip(images, signed_urls)
         ]
         }
-
-        # 4. AI 서버로 캡셔닝 요청
         try:
-            ai_response = requests.get("http://34.64.172.167:8000/generate-caption", json=ai_request_data)
-            ai_response.raise_for_status()
-            caption_results = ai_response.json()
+            return await ai_client.request("/generate-caption", ai_request_data)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail=f"AI server error: {str(e)}"
             )
 
-        # 5. 메타데이터 추출 및 DB 저장
+    # 5. 메타데이터 단계: 업로드 시점에 저장된 메타데이터의 위치 변환
+    async def metadata_stage():
+        meta_map = {img.id: img.meta for img in images if img.meta is not None}
+
+        # 업로드 시점 메타데이터가 없는 기존 이미지만 GCS에서 추출
+        legacy_images = [img for img in images if img.id not in meta_map]
+        legacy_results = await asyncio.gather(
+            *(extract_datetime_location_from_gcs(img.uri) for img in legacy_images),
+            return_exceptions=True
+        )
+        legacy_metas = {}
+        for img, meta in zip(legacy_images, legacy_results):
+            if isinstance(meta, Exception):
+                meta = {"created_at": None, "latitude": None, "longitude": None, "orientation": None}
+            legacy_metas[img.id] = meta
+
+        # 좌표를 장소 단위로 묶어 장소당 한 번만 역지오코딩
+        points = {}
         for img in images:
-            try:
-                meta = extract_datetime_location_from_gcs(img.uri)
-                created_at = meta["created_at"]
-                gps_latitude = meta.get("gps_latitude")
-                gps_latitude_ref = meta.get("gps_latitude_ref")
-                gps_longitude = meta.get("gps_longitude")
-                gps_longitude_ref = meta.get("gps_longitude_ref")
-                if gps_latitude and gps_latitude_ref and gps_longitude and gps_longitude_ref:
-                    lat = convert_to_degrees(gps_latitude)
-                    lon = convert_to_degrees(gps_longitude)
-                    if gps_latitude_ref.values != 'N':
-                        lat = -lat
-                    if gps_longitude_ref.values != 'E':
-                        lon = -lon
-                    location_str = reverse_geocode(lat, lon)
-                else:
-                    location_str = None
-            except Exception:
-                created_at = None
-                location_str = None
-
-
-            # 기존 Metadata 조회
-            existing_meta = db.query(Metadata).filter(Metadata.image_id == img.id).first()
-
-            # Metadata 업데이트 또는 생성
-            if existing_meta:
-                existing_meta.created_at = created_at
-                existing_meta.location = location_str
-            else:
-                db.add(Metadata(
-                    image_id=img.id,
-                    created_at=created_at,
-                    location=location_str
-                ))
-
-            metadata_list.append({
-                "image_id": img.id,
-                "created_at": created_at,
-                "location": location_str,
-            })
+            source = meta_map.get(img.id)
+            lat = source.latitude if source else legacy_metas[img.id]["latitude"]
+            lon = source.longitude if source else legacy_metas[img.id]["longitude"]
+            if lat is not None and lon is not None:
+                points[img.id] = (lat, lon)
+        locations = await reverse_geocode_points(points, db)
+        return meta_map, legacy_metas, locations
+
+    # 두 단계는 서로 독립적이므로 동시에 실행
+    started = time.perf_counter()
+    tasks = [
+        asyncio.ensure_future(timed_stage("caption", caption_stage())),
+        asyncio.ensure_future(timed_stage("metadata", metadata_stage())),
+    ]
+    try:
+        caption_results, (meta_map, legacy_metas, locations) = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    stage_timings["total"] = (time.perf_counter() - started) * 1000
+    await progress(0.9, "saving")
+    logger.info("selection/second travelogue=%s %s", travelogue_id, " ".join(
+        f"{name}={duration:.1f}ms" for name, duration in stage_timings.items()
+    ))
+
+    # 6. 결과를 합쳐 한 번에 DB 반영
+    image_map = {img.id: img for img in images}
+    captured_at_map = {}
+    for img in images:
+        existing_meta = meta_map.get(img.id)
+        if existing_meta is None:
+            meta = legacy_metas[img.id]
+            existing_meta = Metadata(
+                image_id=img.id,
+                created_at=meta["created_at"],
+                latitude=meta["latitude"],
+                longitude=meta["longitude"]
+            )
+            db.add(existing_meta)
+            captured_at_map[img.id] = meta["created_at"]
+            if img.orientation is None:
+                img.orientation = meta["orientation"]
+        location_str = locations.get(img.id, existing_meta.location)
+        existing_meta.location = location_str
+
+        metadata_list.append({
+            "image_id": img.id,
+            "created_at": existing_meta.created_at,
+            "location": location_str,
+        })
+
+    await set_captured_at(db, captured_at_map)
+
+    for cap in caption_results:
+        caption_list.append({
+            "image_id": cap["image_id"],
+            "caption": cap["caption"]
+        })
+        img = image_map.get(cap["image_id"])
+        if img:
+            img.caption = cap["caption"]
+
+    await db.commit()
+    return {
+        "caption_list": caption_list,
+        "metadata_list": metadata_list
+    }, stage_timings
 
-        # 6. 캡션 결과 정리 및 image 테이블에 저장
-        for cap in caption_results:
-            caption_list.append({
-                "image_id": cap["image_id"],
-                "caption": cap["caption"]
-            })
-            # image 테이블에 캡션 저장
-            img = db.query(Image).filter(Image.id == cap["image_id"]).first()
-            if img:
-                img.caption = cap["caption"]
 
-        db.commit()
-        return {
-            "caption_list": caption_list,
-            "metadata_list": metadata_list
-        }
+load_dotenv()
 
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error: {str(e)}"
-        )
-    
+# PDF 내보내기 시 미리 준비해 두는 이미지 수 (메모리 상한). 준비 워커 수보다 작으면 코어를 다 쓰지 못함
+EXPORT_PREFETCH_WINDOW = int(os.getenv("EXPORT_PREFETCH_WINDOW", max(4, IMAGE_PREP_WORKERS)))
+
+def _write_file(path: str, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# 응답을 시작하기 전에 저장소 읽기를 모두 끝내 임시 디렉터리에 받아 둠
+# 스트리밍 도중 저장소 오류가 나면 200 응답이 잘린 PDF로 끝나므로, 실패할 수 있는 읽기는 첫 바이트 전에 처리
+# 메모리에 동시에 올라오는 원본은 EXPORT_PREFETCH_WINDOW개까지. {image_id: 파일 경로 또는 None(저장소에 없음)}
+async def download_export_images(images, directory: str) -> Dict[int, Optional[str]]:
+    semaphore = asyncio.Semaphore(EXPORT_PREFETCH_WINDOW)
+
+    async def download(img):
+        async with semaphore:
+            try:
+                # print 축소본은 이미 PDF 크기/정방향이므로 디코딩만 하면 됨
+                data = await read_blob(extract_gcs_file_name(image_uri_for(img, "print")))
+            except StorageNotFound:
+                return img.id, None
+            path = os.path.join(directory, f"{img.id}.img")
+            await asyncio.to_thread(_write_file, path, data)
+        return img.id, path
+
+    tasks = [asyncio.ensure_future(download(img)) for img in images]
+    try:
+        return dict(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
-load_dotenv()
 
-def correct_image_orientation(pil_img):
+# 디코딩/리사이즈는 CPU 작업이므로 이미지 준비 전용 프로세스 풀에서 실행 (image_prep 참고)
+# jpeg 모드에서는 print 축소본처럼 바로 넣을 수 있는 JPEG은 디코딩 없이 통과시키고, 나머지는 한 번만 JPEG 인코딩
+async def download_and_prepare_image(img, path, max_width_pt, max_height_pt, semaphore, dpi=150, scale=1.1):
+    if path is None:
+        return None, None, None
+    async with semaphore:
+        image_bytes = await asyncio.to_thread(_read_file, path)
+    orientation = 1 if img.has_renditions else img.orientation
+    max_width_px, max_height_px = pdf_target_pixels(max_width_pt, max_height_pt, dpi, scale)
+    if PDF_IMAGE_MODE == "jpeg":
+        jpeg = jpeg_passthrough(image_bytes, orientation, max_width_px, max_height_px)
+        if jpeg is not None:
+            return img, jpeg, jpeg.size
+        prepare = prepare_jpeg_for_pdf
+    else:
+        prepare = prepare_for_pdf
+    loop = asyncio.get_running_loop()
     try:
-        exif = pil_img._getexif()
-        if exif is not None:
-            for orientation in ExifTags.TAGS.keys():
-                if ExifTags.TAGS[orientation] == 'Orientation':
-                    break
-            orientation_value = exif.get(orientation, None)
-            if orientation_value == 3:
-                pil_img = pil_img.rotate(180, expand=True)
-            elif orientation_value == 6:
-                pil_img = pil_img.rotate(270, expand=True)
-            elif orientation_value == 8:
-                pil_img = pil_img.rotate(90, expand=True)
-    except Exception:
-        pass
-    return pil_img
-
-def resize_for_pdf(pil_img, max_width_pt, max_height_pt, dpi=150, scale=1.1):
-    max_width_px = int(max_width_pt * dpi / 72 * scale)
-    max_height_px = int(max_height_pt * dpi / 72 * scale)
-    orig_width, orig_height = pil_img.size
-    ratio = min(max_width_px / orig_width, max_height_px / orig_height, 1.0)
-    new_size = (int(orig_width * ratio), int(orig_height * ratio))
-    return pil_img.resize(new_size, PILImage.LANCZOS)
-
-def download_and_prepare_image(img, max_width_pt, max_height_pt, dpi=150, scale=1.1):
-    file_name = extract_gcs_file_name(img.uri)
-    blob = bucket.blob(file_name)
-    if not blob.exists():
+        pil_img = await loop.run_in_executor(
+            get_image_prep_executor(), prepare, image_bytes, orientation, max_width_px, max_height_px
+        )
+    except OSError as e:
+        # 디코딩할 수 없는 파일은 누락된 이미지처럼 건너뜀
+        logger.warning("%s decode failed: %s", img.uri, e)
         return None, None, None
-    image_bytes = blob.download_as_bytes()
-    stream = io.BytesIO(image_bytes)
-    pil_img = PILImage.open(stream)
-    pil_img = correct_image_orientation(pil_img)
-    pil_img = pil_img.convert("RGB")
-    pil_img = resize_for_pdf(pil_img, max_width_pt, max_height_pt, dpi=dpi, scale=scale)
-    img_width, img_height = pil_img.size
-    return img, pil_img, (img_width, img_height)
+    return img, pil_img, pil_img.size
 
 @router.get(
     "/api/travelogue/{travelogue_id}/export",
@@ -338,138 +403,30 @@ def download_and_prepare_image(img, max_width_pt, max_height_pt, dpi=150, scale=
     summary="여행기 PDF 저장",
     description="완성된 여행기의 PDF 바이너리를 반환합니다."
 )
-async def export_travelogue(travelogue_id: int, db: Session = Depends(get_db)):
+async def export_travelogue(
+    travelogue_id: int,
+    background: bool = Query(False, description="true이면 작업 id를 즉시 반환하고 백그라운드에서 처리"),
+    db: AsyncSession = Depends(get_db)
+):
     try:
-        travelogue = db.query(Travelogue).filter(Travelogue.id == travelogue_id).first()
+        travelogue = await db.get(Travelogue, travelogue_id)
         if not travelogue:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail={"error": f"Travelogue ID {travelogue_id} not found"}
             )
 
-        image_ids = db.query(TravelogueImage.image_id).filter(
-            TravelogueImage.travelogue_id == travelogue_id
-        ).all()
-        image_ids = [i[0] for i in image_ids]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).order_by(Image.id).all()
-
-        if not images:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail={"error": "No images found for this travelogue."}
-            )
-
-        font_path = os.getenv("FONT_PATH", "fonts/malgun.ttf")
-        font_name = "MalgunGothic"
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        font_path_full = os.path.join(base_dir, font_path)
-        
-        try:
-            pdfmetrics.registerFont(TTFont(font_name, font_path_full))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"폰트 등록 실패: {e}")
-
-        images_with_dates = []
-        for img in images:
-            file_name = extract_gcs_file_name(img.uri)
-            blob = bucket.blob(file_name)
-            if not blob.exists():
-                continue
-            created_at = extract_created_at_from_gcs(img.uri)
-            images_with_dates.append({
-                "img": img,
-                "created_at": created_at
-            })
-        images_with_dates.sort(key=lambda x: (x["created_at"] is None, x["created_at"]))
-
-        if not images_with_dates:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail={"error": "GCS에 존재하는 이미지가 없습니다."}
-            )
+        if background:
+            job = await job_engine.submit("export", travelogue_id=travelogue_id)
+            return job_accepted_response(job)
 
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        max_img_width = width * 0.8
-        max_img_height = height * 0.5
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_img = {
-                executor.submit(download_and_prepare_image, item["img"], max_img_width, max_img_height): item
-                for item in images_with_dates
-            }
-            processed_images = []
-            for future in as_completed(future_to_img):
-                img, pil_img, (img_width, img_height) = future.result()
-                if img and pil_img:
-                    processed_images.append((img, pil_img, img_width, img_height))
-
-        processed_images.sort(
-            key=lambda x: (
-                next((item["created_at"] for item in images_with_dates if item["img"] == x[0]), None) is None,
-                next((item["created_at"] for item in images_with_dates if item["img"] == x[0]), None)
-            )
+        chunks, cache_source = await build_travelogue_pdf(db, travelogue_id)
+        return StreamingResponse(
+            chunks,
+            media_type="application/pdf",
+            headers={"X-Export-Cache": cache_source}
         )
 
-        for img, pil_img, img_width, img_height in processed_images:
-            image_reader = ImageReader(pil_img)
-
-            ratio = min(max_img_width / img_width, max_img_height / img_height, 1.0)
-            draw_width = int(img_width * ratio)
-            draw_height = int(img_height * ratio)
-
-            final_text = img.final if img.final is not None else ""
-            font_size = 12
-            line_spacing = 4
-            max_text_width = width * 0.8
-
-            wrapped_lines = []
-            for raw_line in final_text.splitlines():
-                line = ""
-                for char in raw_line:
-                    test_line = line + char
-                    if p.stringWidth(test_line, font_name, font_size) > max_text_width:
-                        wrapped_lines.append(line)
-                        line = char
-                    else:
-                        line = test_line
-                wrapped_lines.append(line)
-
-            text_block_height = len(wrapped_lines) * (font_size + line_spacing) if wrapped_lines else 0
-            block_height = draw_height + (30 if wrapped_lines else 0) + text_block_height
-            y_block = (height - block_height) / 2
-            x = (width - draw_width) / 2
-            y = y_block + text_block_height + (30 if wrapped_lines else 0)
-
-            p.drawImage(image_reader, x, y, width=draw_width, height=draw_height)
-
-            if wrapped_lines:
-                max_line_width = max(p.stringWidth(line, font_name, font_size) for line in wrapped_lines)
-                text_x = (width - max_line_width) / 2
-                text_y = y - 30
-
-                p.setFont(font_name, font_size)
-                text_object = p.beginText(text_x, text_y)
-                for line in wrapped_lines:
-                    text_object.textLine(line)
-                p.drawText(text_object)
-
-            p.showPage()
-
-        p.save()
-        buffer.seek(0)
-        pdf_bytes = buffer.getvalue()
-
-        file_name = f"exports/travelogue_{travelogue_id}.pdf"
-        blob = bucket.blob(file_name)
-        blob.upload_from_string(pdf_bytes, content_type="application/pdf")
-
-        return Response(content=pdf_bytes, media_type="application/pdf")
-
     except HTTPException as e:
         raise
     except Exception as e:
@@ -477,7 +434,190 @@ async def export_travelogue(travelogue_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="서버 내부 오류가 발생했습니다."
         )
-    
+
+
+@job_engine.handler("export", concurrency=2)
+async def export_job(db: AsyncSession, progress: ProgressCallback, travelogue_id: int):
+    chunks, cache_source = await build_travelogue_pdf(db, travelogue_id, progress)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+    file_name = export_pdf_name(travelogue_id)
+    return {
+        "file_name": file_name,
+        "size": size,
+        "cache": cache_source,
+        "url": await generate_signed_url(file_name)
+    }
+
+
+# 준비된 이미지를 입력 순서대로 내보내되, 앞으로 window장까지만 미리 읽기/디코딩
+# 디코딩된 이미지는 최대 window + 1장만 메모리에 존재. paths는 download_export_images 결과
+async def iter_prepared_images(items, paths, max_width_pt, max_height_pt, window=EXPORT_PREFETCH_WINDOW):
+    semaphore = asyncio.Semaphore(window)
+    items = iter(items)
+    pending = deque()
+
+    def schedule(item):
+        pending.append(asyncio.ensure_future(
+            download_and_prepare_image(item["img"], paths[item["img"].id], max_width_pt, max_height_pt, semaphore)
+        ))
+
+    try:
+        for item in itertools.islice(items, window):
+            schedule(item)
+        while pending:
+            img, pil_img, size = await pending.popleft()
+            next_item = next(items, None)
+            if next_item is not None:
+                schedule(next_item)
+            if img and pil_img:
+                yield img, pil_img, size
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def layout_page(p_width, p_height, img_width, img_height, final_text, font):
+    max_img_width = p_width * 0.8
+    max_img_height = p_height * 0.5
+    ratio = min(max_img_width / img_width, max_img_height / img_height, 1.0)
+    draw_width = int(img_width * ratio)
+    draw_height = int(img_height * ratio)
+
+    font_size = 12
+    line_spacing = 4
+    max_text_width = p_width * 0.8
+
+    widths = get_glyph_widths(font)
+    wrapped_lines = wrap_text(final_text, font, font_size, max_text_width, widths)
+
+    text_block_height = len(wrapped_lines) * (font_size + line_spacing) if wrapped_lines else 0
+    block_height = draw_height + (30 if wrapped_lines else 0) + text_block_height
+    y_block = (p_height - block_height) / 2
+    x = (p_width - draw_width) / 2
+    y = y_block + text_block_height + (30 if wrapped_lines else 0)
+
+    lines = []
+    if wrapped_lines:
+        max_line_width = max(widths.text_width(line, font_size) for line in wrapped_lines)
+        text_x = (p_width - max_line_width) / 2
+        text_y = y - 30
+        leading = font_size * 1.2
+        lines = [(text_x, text_y - i * leading, line) for i, line in enumerate(wrapped_lines)]
+    return (x, y, draw_width, draw_height), lines, font_size
+
+
+# 페이지를 만드는 대로 청크를 내보내고, 같은 바이트를 임시 파일에 기록했다가 마지막에 저장소/로컬 캐시로 올림
+# 저장소 읽기는 시작 전에 끝났으므로, 여기서 나는 예외는 삼키지 않고 그대로 올려 서버가 연결을 끊게 함
+# (종료 청크 없이 끊기므로 클라이언트는 완전한 PDF로 착각하지 않음)
+async def render_travelogue_pdf(travelogue_id, fingerprint, font, first_page, pages, page_total, started,
+                                image_dir, progress: ProgressCallback = no_progress):
+    spool = ExportSpool()
+    pending = []
+    writer = None
+
+    def sink(data):
+        spool.write(data)
+        pending.append(data)
+
+    async def all_pages():
+        yield first_page
+        async for page in pages:
+            yield page
+
+    try:
+        width, height = letter
+        writer = StreamingPDFWriter(sink, font, letter)
+        async for img, pil_img, (img_width, img_height) in all_pages():
+            final_text = img.final if img.final is not None else ""
+            image_box, lines, font_size = layout_page(width, height, img_width, img_height, final_text, font)
+            await asyncio.to_thread(writer.add_page, pil_img, image_box, lines, font_size)
+            del pil_img
+            await progress(0.1 + 0.8 * writer.page_count / page_total, "rendering")
+            yield b"".join(pending)
+            pending.clear()
+
+        await asyncio.to_thread(writer.close)
+        yield b"".join(pending)
+        pending.clear()
+
+        elapsed = time.perf_counter() - started
+        record_export_render(writer.page_count, writer.position, elapsed)
+        logger.info("export travelogue %s: %s pages, %.0f KiB, %.2fs (%s)", travelogue_id, writer.page_count,
+                    writer.position / 1024, elapsed, PDF_IMAGE_MODE)
+
+        await progress(0.95, "uploading")
+        await store_export(travelogue_id, fingerprint, spool)
+    finally:
+        await pages.aclose()
+        if writer is not None:
+            writer.discard()
+        spool.discard()
+        image_dir.cleanup()
+
+
+# PDF 청크 스트림과 캐시 출처를 반환
+# 캐시 출처는 local/gcs(저장된 PDF 재사용) 또는 miss(새로 생성하며 exports/에 저장)
+async def build_travelogue_pdf(db: AsyncSession, travelogue_id: int, progress: ProgressCallback = no_progress):
+    started = time.perf_counter()
+    # 촬영시간순 정렬은 capture 인덱스로 DB에서 처리 (GCS 접근 없음)
+    images_with_dates = [
+        {"img": img, "created_at": captured_at}
+        for img, captured_at in await time_ordered_images(db, travelogue_id)
+    ]
+
+    if not images_with_dates:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "No images found for this travelogue."}
+        )
+
+    # 페이지 구성이 지난번과 같으면 저장된 PDF를 그대로 사용
+    fingerprint = export_fingerprint(
+        [(item["img"].id, image_uri_for(item["img"], "print"), item["img"].final, item["created_at"]) for item in images_with_dates],
+        font_path_full()
+    )
+    chunks, cache_source = await open_cached_export(travelogue_id, fingerprint)
+    if chunks is not None:
+        return chunks, cache_source
+
+    try:
+        font = get_pdf_font()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"폰트 등록 실패: {e}")
+
+    width, height = letter
+    # 렌더링이 끝나면 render_travelogue_pdf에서 지우고, 그 전에 실패하면 여기서 지움
+    image_dir = tempfile.TemporaryDirectory(prefix="export.")
+    try:
+        paths = await download_export_images([item["img"] for item in images_with_dates], image_dir.name)
+        pages = iter_prepared_images(images_with_dates, paths, width * 0.8, height * 0.5)
+        # 첫 페이지가 준비될 때까지 기다려, 응답을 시작하기 전에 빈 여행기를 404로 처리
+        first_page = await anext(pages, None)
+        if first_page is None:
+            await pages.aclose()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"error": "GCS에 존재하는 이미지가 없습니다."}
+            )
+    except BaseException:
+        image_dir.cleanup()
+        raise
+    await progress(0.1, "rendering")
+    return render_travelogue_pdf(
+        travelogue_id, fingerprint, font, first_page, pages, len(images_with_dates), started, image_dir, progress
+    ), "miss"
+
+
+@router.get(
+    "/api/metrics/geocode",
+    status_code=status.HTTP_200_OK,
+    summary="역지오코딩 캐시 지표 확인",
+    description="역지오코딩 캐시의 hit/miss와 Nominatim 호출 수를 반환합니다."
+)
+async def get_geocode_metrics():
+    return {"geocode_cache": get_geocode_cache_metrics()}
 
 
 class ShareResponse(BaseModel):
@@ -491,20 +631,15 @@ class ShareResponse(BaseModel):
     description="GCS에 저장된 여행기 PDF의 다운로드 링크를 반환합니다."
 )
 async def share_travelogue_pdf(travelogue_id: int):
-    file_name = f"exports/travelogue_{travelogue_id}.pdf"
-    blob = bucket.blob(file_name)
+    file_name = export_pdf_name(travelogue_id)
 
-    if not blob.exists():
+    if not await blob_exists(file_name):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"PDF 파일이 존재하지 않습니다: {file_name}"
         )
 
-    share_url = blob.generate_signed_url(
-        version="v4",
-        expiration=3600,
-        method="GET"
-    )
+    share_url = await generate_signed_url(file_name, expiration=3600)
 
     return {"share_url": share_url}
 
@@ -521,27 +656,17 @@ class ImageOrderResponse(BaseModel):
 )
 async def order_images_by_time(
     image_ids: List[int] = Query(..., description="정렬할 이미지 id 리스트"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        images = db.query(Image).filter(Image.id.in_(image_ids)).all()
-        if not images:
+        if not (await db.execute(select(Image.id).where(Image.id.in_(image_ids)).limit(1))).first():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="지정한 이미지를 찾을 수 없습니다."
             )
-        
-        created_at_map = {}
-        for img in images:
-            try:
-                created_at_map[img.id] = extract_created_at_from_gcs(img.uri)
-            except Exception:
-                created_at_map[img.id] = None
 
-        ordered_ids = sorted(
-            image_ids,
-            key=lambda x: (created_at_map.get(x) is None, created_at_map.get(x))
-        )
+        # 업로드/메타데이터 수정 시 저장된 촬영시간 인덱스로 정렬 (GCS 재다운로드 없음)
+        ordered_ids = await order_image_ids_by_capture(db, image_ids)
 
         return {"image_ids": ordered_ids}
     except HTTPException:
@@ -1,29 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Form, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Response, Form, File, UploadFile, Query
 from pydantic import BaseModel, Field
 from datetime import datetime
-from database import SessionLocal
-from typing import Annotated, List
-from sqlalchemy.orm import Session
+from database import SessionLocal, get_pool_metrics
+from typing import Annotated, List, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import *
 from starlette import status
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_, asc
-from gcs_utils import upload_image_to_gcs, delete_image_from_gcs, generate_signed_url
-import requests
+from sqlalchemy import select, update
+from gcs_utils import upload_image_to_gcs, upload_stream_to_gcs, delete_image_from_gcs, generate_signed_urls
+from exif_utils import extract_metadata_from_file
+from capture_index import set_captured_at
+from image_repository import load_active_images
+from generation_context import load_generation_context
+from image_registry import register_images
+from image_prep import get_image_prep_executor, make_renditions, rendition_name, image_uri_for
+from ai_client import ai_client
+from jobs import job_engine, ProgressCallback, no_progress
+from api_jobs import job_accepted_response
 import asyncio
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 
 class TravelogueUpdate(BaseModel):
@@ -43,7 +53,7 @@ class TravelogueResponse(BaseModel):
     description="현재 데이터베이스에 저장된 모든 여행기 튜플을 확인합니다"
 )
 async def get_travelogue(db: db_dependency):
-    return db.query(Travelogue).all()
+    return (await db.scalars(select(Travelogue))).all()
 
 
 @router.get(
@@ -54,7 +64,7 @@ async def get_travelogue(db: db_dependency):
     description="현재 데이터베이스에 저장된 특정 id 여행기 튜플을 확인합니다"
 )
 async def get_travelogue(travelogue_id: int, db: db_dependency):
-    db_travelogue = db.query(Travelogue).filter(Travelogue.id == travelogue_id).first()
+    db_travelogue = await db.get(Travelogue, travelogue_id)
     if not db_travelogue:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"error": "Travelogue not found"})
@@ -71,8 +81,8 @@ async def get_travelogue(travelogue_id: int, db: db_dependency):
 async def create_travelogue(db: db_dependency):
     db_travelogue = Travelogue()
     db.add(db_travelogue)
-    db.commit()
-    db.refresh(db_travelogue)
+    await db.commit()
+    await db.refresh(db_travelogue)
     return db_travelogue
 
 
@@ -83,12 +93,12 @@ async def create_travelogue(db: db_dependency):
     description="지정된 여행기의 style_category를 업데이트합니다."
 )
 async def update_travelogue(travelogue_id: int, update: TravelogueUpdate, db: db_dependency):
-    db_travelogue = db.query(Travelogue).filter(Travelogue.id == travelogue_id).first()
+    db_travelogue = await db.get(Travelogue, travelogue_id)
     if not db_travelogue:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"error": "Travelogue not found"})
     db_travelogue.style_category = update.style_category
-    db.commit()
+    await db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -112,6 +122,52 @@ class CombinedResponse(BaseModel):
     image_list: List[ImageResponse]
 
 
+# 축소본을 만들어 업로드하고 업로드된 파일명 목록을 반환
+# 축소본은 선택 사항이므로 실패하면 정리 후 빈 목록을 반환하고, 소비자는 원본을 사용
+async def create_and_upload_renditions(image_path: str, file_name: str, orientation) -> List[str]:
+    loop = asyncio.get_running_loop()
+    try:
+        renditions = await loop.run_in_executor(
+            get_image_prep_executor(), make_renditions, image_path, orientation
+        )
+    except Exception as e:
+        logger.warning("%s rendition failed: %s", file_name, e)
+        return []
+
+    names = [rendition_name(file_name, kind) for kind in renditions]
+    results = await asyncio.gather(*(
+        upload_image_to_gcs(data, name, content_type="image/jpeg")
+        for name, data in zip(names, renditions.values())
+    ), return_exceptions=True)
+    if any(isinstance(result, Exception) for result in results):
+        await asyncio.gather(*(
+            delete_image_from_gcs(name) for name, result in zip(names, results)
+            if not isinstance(result, Exception)
+        ))
+        return []
+    return names
+
+
+# 원본을 청크 단위로 저장소에 올리면서 같은 내용을 임시 파일에 남기고, EXIF/축소본은 임시 파일에서 처리
+# 요청의 메모리 사용량은 앨범 크기가 아니라 (청크 + 쓰기 버퍼) × gcs_utils.UPLOAD_STREAM_CONCURRENCY로 제한됨
+# 원본을 올린 뒤 EXIF/축소본 단계에서 실패하면 올린 원본을 지우고 예외를 그대로 전달
+async def upload_image_stream(image: UploadFile, file_name: str):
+    fd, spool_path = tempfile.mkstemp(suffix=".upload")
+    uri = None
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            uri = await upload_stream_to_gcs(image, file_name, content_type=image.content_type, tee=spool)
+        meta = await asyncio.to_thread(extract_metadata_from_file, spool_path)
+        renditions = await create_and_upload_renditions(spool_path, file_name, meta["orientation"])
+    except BaseException:
+        if uri is not None:
+            await delete_image_from_gcs(file_name)
+        raise
+    finally:
+        os.remove(spool_path)
+    return uri, meta, renditions
+
+
 @router.post(
     "/api/image/upload",
     status_code=status.HTTP_201_CREATED,
@@ -120,79 +176,71 @@ class CombinedResponse(BaseModel):
     description="입력된 이미지를 기반으로 튜플을 생성하고, GCP Storage에 업로드합니다."
 )
 async def create_image(db: db_dependency, travelogue_id: int = Form(...), images: List[UploadFile] = File(...)):
-    travelogue = db.get(Travelogue, travelogue_id)
+    travelogue = await db.get(Travelogue, travelogue_id)
     if not travelogue:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Travelogue id : {travelogue_id} not found"
         )
     try:
-        result_mapping = []
-        result_image = []
         uploaded_files = []
 
-        # 1. 파일 읽기(비동기) & 업로드 태스크 생성
-        upload_tasks = []
-        file_bytes_list = []
-        file_name_list = []
-
-        for i, image in enumerate(images, start=1):
-            file_name = f"{travelogue_id}_{i}.jpg"
-            file_bytes = await image.read()
-            file_bytes_list.append(file_bytes)
-            file_name_list.append(file_name)
-            upload_tasks.append(
-                upload_image_to_gcs(file_bytes, file_name, content_type=image.content_type)
+        # 1. 파일별로 원본 스트리밍 업로드 → EXIF 추출 → 축소본 생성/업로드 (동시에 열린 업로드 스트림 수는 gcs_utils.upload_stream_semaphore로 제한)
+        file_name_list = [f"{travelogue_id}_{i}.jpg" for i in range(1, len(images) + 1)]
+        results = await asyncio.gather(*(
+            upload_image_stream(image, file_name) for image, file_name in zip(images, file_name_list)
+        ), return_exceptions=True)
+        rendition_files = [
+            name for result in results if not isinstance(result, BaseException) for name in result[2]
+        ]
+        uploaded_files.extend(rendition_files)
+
+        # 2. 업로드 결과 확인 (하나라도 실패하면 성공한 업로드 전체 삭제)
+        failed = next((result for result in results if isinstance(result, BaseException)), None)
+        if failed is not None:
+            uploaded_files = [
+                fn for fn, result in zip(file_name_list, results)
+                if not isinstance(result, BaseException)
+            ] + rendition_files
+            await asyncio.gather(*(delete_image_from_gcs(fn) for fn in uploaded_files))
+            uploaded_files = []
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"GCS upload failed: {str(failed)}"
             )
-
-        # 2. 병렬 업로드 실행
-        upload_results = await asyncio.gather(*upload_tasks, return_exceptions=True)
-
-        # 3. 업로드 결과 처리 및 DB 저장
-        for i, (uri, file_name, file_bytes) in enumerate(zip(upload_results, file_name_list, file_bytes_list), start=1):
-            if isinstance(uri, Exception):
-                # 업로드 실패시 롤백 및 정리
-                for fn in uploaded_files:
-                    delete_image_from_gcs(fn)
-                db.rollback()
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"GCS upload failed: {str(uri)}"
-                )
-
-            uploaded_files.append(file_name)
+        uploaded_files.extend(file_name_list)
+        for file_name in file_name_list:
             print(file_name, "Uploaded")
 
-            image_obj = Image(
-                travelogue_image_id=i,
-                uri=uri,
-                is_in_travelogue=True
-            )
-            db.add(image_obj)
-            db.flush()
-
-            mapping = TravelogueImage(
-                travelogue_id=travelogue_id,
-                image_id=image_obj.id
-            )
-            db.add(mapping)
-
-            result_image.append(image_obj)
-            result_mapping.append(mapping)
-        db.commit()
-        return {"mapping_list": result_mapping, "image_list": result_image}
+        # 3. DB 저장: 이미지 수와 무관하게 INSERT 세 번 (image_registry 참고)
+        result_image, result_mapping = await register_images(db, travelogue_id, [
+            {
+                "uri": uri,
+                "orientation": meta["orientation"],
+                "has_renditions": bool(renditions),
+                "created_at": meta["created_at"],
+                "latitude": meta["latitude"],
+                "longitude": meta["longitude"],
+            }
+            for uri, meta, renditions in results
+        ])
+        response = {
+            "mapping_list": result_mapping,
+            "image_list": [ImageResponse.model_validate(image, from_attributes=True) for image in result_image]
+        }
+        await db.commit()
+        return response
     except IntegrityError as e:
-        db.rollback()
-        for file_name in uploaded_files:
-            delete_image_from_gcs(file_name)
+        await db.rollback()
+        await asyncio.gather(*(delete_image_from_gcs(fn) for fn in uploaded_files))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Foreign key constraint failed: {str(e.orig)}"
         )
     except Exception as e:
-        db.rollback()
-        for file_name in uploaded_files:
-            delete_image_from_gcs(file_name)
+        await db.rollback()
+        await asyncio.gather(*(delete_image_from_gcs(fn) for fn in uploaded_files))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -213,25 +261,23 @@ class ActivatedListResponse(BaseModel):
     summary="is_in_travelogue가 true인 image url 반환",
     description="travelogue_id에 해당하는 image 튜플 중 is_in_travelogue가 true인 image의 Signed UR을 반환합니다."
 )
-async def get_used_image_url_and_draft(db: db_dependency, travelogue_id: int):
-    mappings = db.query(TravelogueImage).filter(TravelogueImage.travelogue_id == travelogue_id).all()
-    if not mappings:
+async def get_used_image_url_and_draft(
+    db: db_dependency,
+    travelogue_id: int,
+    size: Literal["thumb", "ai", "print", "original"] = Query("ai", description="반환할 이미지 크기 (축소본이 없는 이미지는 원본)")
+):
+    images = await load_active_images(db, travelogue_id)
+    if images is None:
         raise HTTPException(  
                 status_code=status.HTTP_404_NOT_FOUND,  
                 detail=f"Travelogue id : {travelogue_id} not found"  
             )
     
     try:
-        image_ids = [mapping.image_id for mapping in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).all()
+        signed_urls = await generate_signed_urls([image_uri_for(image, size) for image in images])
 
         result = []
-        for image in images:
-            signed_url = generate_signed_url(image.uri)
-
+        for image, signed_url in zip(images, signed_urls):
             result.append({
                 "image_id": image.id,
                 "image_url": signed_url
@@ -261,31 +307,19 @@ class ImageMetadataResponse(BaseModel):
     description="travelogue_id가 true인 이미지 중 메타데이터 누락 사항이 있는 것을 확인합니다."
 )
 async def get_none_metadata_image(db: db_dependency, travelogue_id: int):
-    mappings = db.query(TravelogueImage).filter(TravelogueImage.travelogue_id == travelogue_id).all()
-    if not mappings:
+    images = await load_active_images(db, travelogue_id, with_metadata=True)
+    if images is None:
         raise HTTPException(  
                 status_code=status.HTTP_404_NOT_FOUND,  
                 detail=f"Travelogue id : {travelogue_id} not found"  
             )
     
     try:
-        image_ids = [mapping.image_id for mapping in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).all()
-        
-        image_id_list = [image.id for image in images]
-        if not image_id_list:
-            return []
-
-        metadatas = db.query(Metadata.image_id, Metadata.created_at, Metadata.location).filter(
-            Metadata.image_id.in_(image_id_list),
-            or_(
-                Metadata.created_at == None,
-                Metadata.location == None
-            )
-        ).all()
+        metadatas = [
+            {"image_id": image.id, "created_at": image.meta.created_at, "location": image.meta.location}
+            for image in images
+            if image.meta is not None and (image.meta.created_at is None or image.meta.location is None)
+        ]
 
         return {"image_metadata_list": metadatas}
     except Exception as e:
@@ -308,16 +342,17 @@ class MetadataUpdate(BaseModel):
     description="지정된 메타데이터의 created_at, location을 업데이트합니다."
 )
 async def update_metadata(db: db_dependency, update: MetadataUpdate, image_id: int):
-    db_metadata = db.query(Metadata).filter(Metadata.image_id == image_id).first()
+    db_metadata = (await db.scalars(select(Metadata).where(Metadata.image_id == image_id).limit(1))).first()
     if not db_metadata:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"error": "Metadata not found"})
     db_metadata.created_at = update.created_at
     db_metadata.location = update.location
     try:
-        db.commit()
+        await set_captured_at(db, {image_id: update.created_at})
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -337,15 +372,15 @@ class FinalRequest(BaseModel):
     description="image_id에 해당하는 튜플의 final 값을 저장합니다."
 )
 async def update_final(db: db_dependency, image_id: int, final: FinalRequest):
-    db_image = db.query(Image).filter(Image.id == image_id).first()
+    db_image = await db.get(Image, image_id)
     if not db_image:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"error": "image not found"})
     db_image.final = final.final
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -379,29 +414,29 @@ class EachImageQuestionResponse(BaseModel):
     description="개별 이미지에 대한 사전 질문 응답을 emotion, image_question_response 테이블에 저장합니다."
 )
 async def create_image_question_response(db: db_dependency, image_id: int, request: ImageQuestionRequest):
-    if not db.query(Image).filter(Image.id == image_id).first():
+    if not await db.get(Image, image_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"error": "Travelogue not found"})
     try:
         db_image_question_response = ImageQuestionResponse(image_id=image_id, how=request.how)
         db.add(db_image_question_response)
-        db.flush()
+        await db.flush()
 
         emotion_list = []
         for e in request.emotion:
             db_emotion = Emotion(question_response_id=db_image_question_response.id, emotion_category=e)
             db.add(db_emotion)
-            db.flush()
+            await db.flush()
             emotion_list.append({
                 "id": db_emotion.id,
                 "question_response_id": db_emotion.question_response_id,
                 "emotion_category": db_emotion.emotion_category
             })
-        db.commit()
+        await db.commit()
 
         return {"image_id": image_id, "how": request.how, "emotion_list": emotion_list}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(  
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,  
             detail=f"Unexpected error: {str(e)}"
@@ -425,28 +460,14 @@ class DraftResponse(BaseModel):
     description="travelogue_id에 대한 draft를 시간 순으로 정렬해 반환합니다."
 )
 async def get_time_ordered_travelogue_draft(db: db_dependency, travelogue_id: int):
-    mappings = db.query(TravelogueImage).filter(TravelogueImage.travelogue_id == travelogue_id).all()
-    if not mappings:
+    # 촬영시간순으로 정렬된 활성 이미지
+    sorted_images = await load_active_images(db, travelogue_id)
+    if sorted_images is None:
         raise HTTPException(  
                 status_code=status.HTTP_404_NOT_FOUND,  
                 detail=f"Travelogue id : {travelogue_id} not found"  
             )
     try:
-        image_ids = [mapping.image_id for mapping in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).all()
-
-        image_dict = {image.id: image for image in images}
-        sorted_images = [
-            image_dict[metadata.image_id]
-            for metadata in db.query(Metadata)
-                .filter(Metadata.image_id.in_(image_ids))
-                .order_by(asc(Metadata.created_at))
-            if metadata.image_id in image_dict
-        ]
-
         return {"draft_list": [{"image_id": image.id, "draft": image.draft} for image in sorted_images]}
     except Exception as e:
         raise HTTPException(  
@@ -461,69 +482,78 @@ async def get_time_ordered_travelogue_draft(db: db_dependency, travelogue_id: in
     summary="이미지 중요도/1차 선별 수행",
     description="각 이미지의 중요도에 따라 image_num만큼만 선별하여 1차 선별을 수행합니다."
 )
-async def execute_first_selection(db: db_dependency, image_num: int, travelogue_id: int):
-    mappings = db.query(TravelogueImage).filter(TravelogueImage.travelogue_id == travelogue_id).all()
-    if not mappings:
+async def execute_first_selection(
+    db: db_dependency,
+    image_num: int,
+    travelogue_id: int,
+    background: bool = Query(False, description="true이면 작업 id를 즉시 반환하고 백그라운드에서 처리")
+):
+    mapping = (await db.scalars(
+        select(TravelogueImage).where(TravelogueImage.travelogue_id == travelogue_id).limit(1)
+    )).first()
+    if not mapping:
         raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,  
                 detail=f"Travelogue id : {travelogue_id} not found"  
             )
     try:
-        image_ids = [mapping.image_id for mapping in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).all()
-
-        purposes = db.query(Purpose).filter(Purpose.travelogue_id == travelogue_id).all()
-        purpose_categories = db.query(PurposeCategory).all()
-        purpose_category_dict = {pc.id: pc.purpose for pc in purpose_categories}
-        purpose_list = [purpose_category_dict[purpose.purpose_category] for purpose in purposes]
-
-        ai_request_data = {
-            "image_list": [{"image_id": image.id, "image_url": generate_signed_url(image.uri)} for image in images],
-            "purpose": purpose_list
-        }
-
-        ai_server = "http://34.64.172.167:8000/select-primary-image"
-        ai_response_data = requests.get(
-            ai_server,
-            headers={"Content-Type": "application/json"},
-            json=ai_request_data
-        )
-        if ai_response_data.status_code != 200:
-            raise Exception(f"AI API Error: {ai_response_data.text}")
-
-        importance_data = ai_response_data.json()
-        
-        importance_map = {item["image_id"]: item["importance"] for item in importance_data}
-        
-        for image in images:
-            image.importance = importance_map.get(image.id, 0.0)
-            db.add(image)
-        sorted_images = sorted(images, key=lambda x: x.importance, reverse=True)
-
-        if image_num > len(images):
-            image_num = len(images)
-        selected_images = sorted_images[:image_num]
-        unselected_images = sorted_images[image_num:]
-
-        for image in unselected_images:
-            image.is_in_travelogue = False
-            db.add(image)
-        for image in selected_images:
-            db.add(image)
-        db.commit()
+        if background:
+            job = await job_engine.submit("first_selection", travelogue_id=travelogue_id, image_num=image_num)
+            return job_accepted_response(job)
 
+        await run_first_selection(db, travelogue_id, image_num)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(  
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
         )
 
 
+@job_engine.handler("first_selection", concurrency=4)
+async def first_selection_job(db: AsyncSession, progress: ProgressCallback, travelogue_id: int, image_num: int):
+    await run_first_selection(db, travelogue_id, image_num, progress)
+
+
+async def run_first_selection(db: AsyncSession, travelogue_id: int, image_num: int, progress: ProgressCallback = no_progress):
+    images = await load_active_images(db, travelogue_id) or []
+
+    purposes = (await db.scalars(select(Purpose).where(Purpose.travelogue_id == travelogue_id))).all()
+    purpose_categories = (await db.scalars(select(PurposeCategory))).all()
+    purpose_category_dict = {pc.id: pc.purpose for pc in purpose_categories}
+    purpose_list = [purpose_category_dict[purpose.purpose_category] for purpose in purposes]
+
+    signed_urls = await generate_signed_urls([image_uri_for(image, "ai") for image in images])
+    ai_request_data = {
+        "image_list": [{"image_id": image.id, "image_url": url} for image, url in zip(images, signed_urls)],
+        "purpose": purpose_list
+    }
+
+    await progress(0.1, "ai_request")
+    importance_data = await ai_client.request("/select-primary-image", ai_request_data)
+    await progress(0.9, "saving")
+    
+    importance_map = {item["image_id"]: item["importance"] for item in importance_data}
+    
+    for image in images:
+        image.importance = importance_map.get(image.id, 0.0)
+        db.add(image)
+    sorted_images = sorted(images, key=lambda x: x.importance, reverse=True)
+
+    if image_num > len(images):
+        image_num = len(images)
+    selected_images = sorted_images[:image_num]
+    unselected_images = sorted_images[image_num:]
+
+    for image in unselected_images:
+        image.is_in_travelogue = False
+        db.add(image)
+    for image in selected_images:
+        db.add(image)
+    await db.commit()
+
+
 
 @router.patch(
     "/api/travelogue/{travelogue_id}/generation",
@@ -531,86 +561,82 @@ async def execute_first_selection(db: db_dependency, image_num: int, travelogue_
     summary="여행기 초안 생성 및 저장",
     description="travelogue_id에 대한 여행기를 생성하여 저장합니다."
 )
-async def execute_travelogue_generation(db: db_dependency, travelogue_id: int):
-    mappings = db.query(TravelogueImage).filter(TravelogueImage.travelogue_id == travelogue_id).all()
-    if not mappings:
+async def execute_travelogue_generation(
+    db: db_dependency,
+    travelogue_id: int,
+    background: bool = Query(False, description="true이면 작업 id를 즉시 반환하고 백그라운드에서 처리")
+):
+    mapping = (await db.scalars(
+        select(TravelogueImage).where(TravelogueImage.travelogue_id == travelogue_id).limit(1)
+    )).first()
+    if not mapping:
         raise HTTPException(  
                 status_code=status.HTTP_404_NOT_FOUND,  
                 detail=f"Travelogue id : {travelogue_id} not found"  
             )
     try:
-        image_ids = [mapping.image_id for mapping in mappings]
-        images = db.query(Image).filter(
-            Image.id.in_(image_ids),
-            Image.is_in_travelogue == True
-        ).all()
-        # 여행기 who, style
-        who_category = db.query(TravelQuestionResponse).filter(TravelQuestionResponse.travelogue_id == travelogue_id).first()
-        who = db.query(WhoCategory).filter(WhoCategory.id == who_category.who_category).first()
-        style_category = db.query(Travelogue).filter(Travelogue.id == travelogue_id).first()
-        style = db.query(StyleCategory).filter(StyleCategory.id == style_category.style_category).first()
-
-        # 이미지 별 how
-        how_responses = db.query(ImageQuestionResponse).filter(ImageQuestionResponse.image_id.in_(image_ids)).all()
-        how_map = {q.image_id: q.how for q in how_responses}
-
-        # emotion
-        emotion_responses = db.query(ImageQuestionResponse.image_id,EmotionCategory.emotion) \
-                            .join(Emotion, Emotion.question_response_id == ImageQuestionResponse.id) \
-                            .join(EmotionCategory, Emotion.emotion_category == EmotionCategory.id) \
-                            .filter(ImageQuestionResponse.image_id.in_(image_ids)).all()
-
-        emotion_map = {}
-        for image_id, emotion in emotion_responses:
-            if image_id not in emotion_map:
-                emotion_map[image_id] = []
-            emotion_map[image_id].append(emotion)
-
-        # 메타데이터 조회
-        metadata_list = db.query(Metadata).filter(Metadata.image_id.in_(image_ids)).all()
-        metadata_map = {m.image_id: m for m in metadata_list}
-
-        ai_request_data = {
-            "image_list": [
-                {
-                    "image_id": image.id,
-                    "who": who.who if who.who else None,
-                    "how": how_map.get(image.id),
-                    "emotion": emotion_map.get(image.id, []),
-                    "created_at": metadata_map.get(image.id).created_at.isoformat()
-                        if image.id in metadata_map and metadata_map[image.id].created_at
-                        else None,
-                    "location": metadata_map.get(image.id).location
-                        if image.id in metadata_map and metadata_map[image.id].location
-                        else None,
-                    "style": style.style if style.style else None,
-                    "caption": image.caption if image.caption else None
-                }
-                for image in images
-            ]
-        }
-        print(ai_request_data)
-        ai_server = "http://34.64.172.167:8000/generate-travel-log" # ai_server endpoint
-        ai_response_data = requests.get(
-            ai_server,
-            json=ai_request_data
-        )
-        print(ai_response_data.json())
-        if ai_response_data.status_code != 200:
-            raise Exception(f"AI API Error: {ai_response_data.text}")
-        
-        draft_data = ai_response_data.json()
-
-        draft_map = {item["image_id"]: item["draft"] for item in draft_data}
-        for image in images:
-            image.draft = draft_map.get(image.id, "")
-            db.add(image)
-        db.commit()
+        if background:
+            job = await job_engine.submit("generation", travelogue_id=travelogue_id)
+            return job_accepted_response(job)
 
+        await run_travelogue_generation(db, travelogue_id)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(  
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,  
             detail=f"Unexpected error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@job_engine.handler("generation", concurrency=4)
+async def generation_job(db: AsyncSession, progress: ProgressCallback, travelogue_id: int):
+    await run_travelogue_generation(db, travelogue_id, progress)
+
+
+async def run_travelogue_generation(db: AsyncSession, travelogue_id: int, progress: ProgressCallback = no_progress):
+    # 이미지/메타데이터, how, emotion, who, style을 쿼리 한 번으로 로드 (이미지는 촬영시간순)
+    context = await load_generation_context(db, travelogue_id)
+    images = context["images"] if context else []
+    who = context["who"] if context else None
+    style = context["style"] if context else None
+
+    ai_request_data = {
+        "image_list": [
+            {
+                "image_id": image["image_id"],
+                "who": who if who else None,
+                "how": image["how"],
+                "emotion": image["emotion"],
+                "created_at": image["created_at"] if image["created_at"] else None,
+                "location": image["location"] if image["location"] else None,
+                "style": style if style else None,
+                "caption": image["caption"] if image["caption"] else None
+            }
+            for image in images
+        ]
+    }
+    print(ai_request_data)
+    await progress(0.1, "ai_request")
+    draft_data = await ai_client.request("/generate-travel-log", ai_request_data)
+    print(draft_data)
+    await progress(0.9, "saving")
+
+    # 이미지 객체를 읽지 않았으므로 기본 키로 묶어 한 번에 UPDATE
+    draft_map = {item["image_id"]: item["draft"] for item in draft_data}
+    if images:
+        await db.execute(update(Image), [
+            {"id": image["image_id"], "draft": draft_map.get(image["image_id"], "")}
+            for image in images
+        ])
+    await db.commit()
+
+
+@router.get(
+    "/api/metrics/database",
+    status_code=status.HTTP_200_OK,
+    summary="DB 커넥션 풀 지표 확인",
+    description="비동기 DB 엔진의 풀 크기, 사용 중/유휴 연결 수와 overflow 연결 수를 반환합니다."
+)
+async def get_database_metrics():
+    return {"pool": get_pool_metrics()}
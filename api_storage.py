@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette import status
+from gcs_utils import get_storage, get_signed_url_cache_metrics, get_storage_concurrency_metrics
+from export_cache import get_export_cache_metrics
+from storage_backends import LocalStorage, StorageNotFound
+import mimetypes
+
+router = APIRouter()
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def iter_view(view: memoryview, chunk_size: int = STREAM_CHUNK_SIZE):
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size]
+
+
+@router.get(
+    "/api/storage/{file_path:path}",
+    status_code=status.HTTP_200_OK,
+    summary="로컬 저장소 파일 다운로드",
+    description="로컬 저장소 백엔드가 발급한 서명 URL로 파일을 내려받습니다. (GCS Signed URL 대체)"
+)
+async def download_local_object(file_path: str, expires: int = Query(...), signature: str = Query(...)):
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail={"error": "Local storage backend is not enabled"})
+    if not storage.verify(file_path, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail={"error": "Invalid or expired signature"})
+    try:
+        view = storage.open_view(file_path)
+    except StorageNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail={"error": f"{file_path} not found"})
+
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    return StreamingResponse(
+        iter_view(view),
+        media_type=media_type,
+        headers={"Content-Length": str(len(view))}
+    )
+
+
+@router.get(
+    "/api/metrics/storage",
+    status_code=status.HTTP_200_OK,
+    summary="저장소 캐시 지표 확인",
+    description="서명 URL 캐시와 PDF 내보내기 캐시의 hit/miss, 읽기/쓰기/삭제별 동시 실행 한도와 대기 수 등 저장소 관련 지표를 반환합니다."
+)
+async def get_storage_metrics():
+    return {
+        "signed_url_cache": get_signed_url_cache_metrics(),
+        "export_cache": get_export_cache_metrics(),
+        "concurrency": get_storage_concurrency_metrics(),
+    }
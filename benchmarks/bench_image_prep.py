@@ -0,0 +1,87 @@
+"""PDF 내보내기용 이미지 준비 처리량 비교
+
+  기존: 전체 해상도 디코딩 + LANCZOS 리사이즈, ThreadPoolExecutor(5)
+  draft+thread: JPEG draft 디코딩, ThreadPoolExecutor
+  draft+process: JPEG draft 디코딩, ProcessPoolExecutor (코어 수만큼)
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_image_prep.py --count 40 --size 4032x3024
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image as PILImage
+import argparse
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_prep import prepare_for_pdf, pdf_target_pixels, correct_image_orientation, resize_for_pdf
+
+# letter 용지 기준 export_travelogue와 같은 최대 크기
+MAX_WIDTH_PT = 612 * 0.8
+MAX_HEIGHT_PT = 792 * 0.5
+
+
+def make_photo(width: int, height: int, seed: int) -> bytes:
+    # 단색 이미지는 디코딩이 지나치게 빨라 실제 사진과 차이가 크므로 노이즈를 섞음
+    rng = random.Random(seed)
+    base = PILImage.radial_gradient("L").resize((width, height)).convert("RGB")
+    noise = PILImage.frombytes("RGB", (width // 8, height // 8), rng.randbytes((width // 8) * (height // 8) * 3))
+    img = PILImage.blend(base, noise.resize((width, height)), 0.5)
+    exif = PILImage.Exif()
+    exif[0x0112] = 6 if seed % 4 == 0 else 1
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+def legacy_prepare(image_bytes: bytes):
+    pil_img = PILImage.open(io.BytesIO(image_bytes))
+    pil_img = correct_image_orientation(pil_img)
+    pil_img = pil_img.convert("RGB")
+    return resize_for_pdf(pil_img, MAX_WIDTH_PT, MAX_HEIGHT_PT)
+
+
+def draft_prepare(image_bytes: bytes):
+    return prepare_for_pdf(image_bytes, None, *pdf_target_pixels(MAX_WIDTH_PT, MAX_HEIGHT_PT))
+
+
+def run(name, executor, func, photos):
+    # 워커 기동 비용은 제외
+    list(executor.map(func, photos[:1]))
+    started = time.perf_counter()
+    sizes = list(executor.map(func, photos))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<16} {len(photos) / elapsed:8.1f} img/s  {elapsed:6.2f}s  output={sizes[0].size}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--size", default="4032x3024")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+
+    print(f"generating {args.count} photos of {width}x{height} ...")
+    unique = [make_photo(width, height, seed) for seed in range(min(args.count, 8))]
+    photos = [unique[i % len(unique)] for i in range(args.count)]
+    print(f"cpu={os.cpu_count()} workers={args.workers}")
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        baseline = run("legacy+thread", executor, legacy_prepare, photos)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        draft_thread = run("draft+thread", executor, draft_prepare, photos)
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        draft_process = run("draft+process", executor, draft_prepare, photos)
+
+    print(f"speedup vs legacy: draft+thread x{baseline / draft_thread:.2f}, draft+process x{baseline / draft_process:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""업로드 등록(DB 저장) 방식 비교
+
+  per-row: 이미지마다 add + flush로 id를 받아 매핑/메타데이터 추가 (기존 create_image)
+  bulk: image_registry.register_images (INSERT ... RETURNING 한 번 + 다중 행 INSERT 두 번)
+
+로컬 Postgres의 빈 DB에 trip_to_travel 스키마를 만들어 측정하고, 각 회차는 롤백하므로 데이터가 남지 않음
+--rtt-ms로 원격 DB(SSL)의 왕복 지연을 흉내낼 수 있음 (문장 실행마다 sleep)
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_image_registry.py --url postgresql+asyncpg://postgres@localhost/bench --sizes 10,100,500
+    python benchmarks/bench_image_registry.py --url ... --rtt-ms 20
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from models import Travelogue, Image, TravelogueImage, Metadata
+from image_registry import register_images
+
+
+def make_entries(count: int):
+    start = datetime(2024, 5, 1, 9, 0)
+    return [
+        {
+            "uri": f"gs://bench/1_{i}.jpg",
+            "orientation": 1,
+            "has_renditions": True,
+            "created_at": start + timedelta(minutes=i),
+            "latitude": 37.5 + i * 1e-4,
+            "longitude": 127.0,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def per_row_register(db, travelogue_id, entries):
+    for i, entry in enumerate(entries, start=1):
+        image_obj = Image(
+            travelogue_image_id=i,
+            uri=entry["uri"],
+            is_in_travelogue=True,
+            orientation=entry["orientation"],
+            has_renditions=entry["has_renditions"]
+        )
+        db.add(image_obj)
+        await db.flush()
+        db.add(TravelogueImage(travelogue_id=travelogue_id, image_id=image_obj.id, captured_at=entry["created_at"]))
+        db.add(Metadata(
+            image_id=image_obj.id,
+            created_at=entry["created_at"],
+            latitude=entry["latitude"],
+            longitude=entry["longitude"]
+        ))
+    await db.flush()
+
+
+async def bulk_register(db, travelogue_id, entries):
+    await register_images(db, travelogue_id, entries)
+    await db.flush()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "postgresql+asyncpg://postgres@localhost/postgres"))
+    parser.add_argument("--sizes", default="10,100,500")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    statements = {"count": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements["count"] += 1
+        if args.rtt_ms:
+            time.sleep(args.rtt_ms / 1000)
+
+    if engine.dialect.name == "sqlite":
+        # 스키마 없는 SQLite에서도 돌려볼 수 있도록 trip_to_travel을 붙임
+        @event.listens_for(engine.sync_engine, "connect")
+        def attach_schema(dbapi_conn, record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("ATTACH DATABASE ':memory:' AS trip_to_travel")
+            cursor.close()
+    async with engine.begin() as conn:
+        if engine.dialect.name != "sqlite":
+            await conn.execute(text("CREATE SCHEMA IF NOT EXISTS trip_to_travel"))
+        await conn.run_sync(Base.metadata.create_all, tables=[
+            Travelogue.__table__, Image.__table__, TravelogueImage.__table__, Metadata.__table__
+        ])
+    Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async with Session() as db:
+        travelogue = Travelogue(style_category=1)
+        db.add(travelogue)
+        await db.commit()
+        travelogue_id = travelogue.id
+
+    print(f"dialect={engine.dialect.name} rtt={args.rtt_ms}ms repeat={args.repeat}")
+    print(f"{'images':>7} {'per-row ms':>11} {'stmts':>6} {'bulk ms':>9} {'stmts':>6} {'speedup':>8}")
+    for size in map(int, args.sizes.split(",")):
+        entries = make_entries(size)
+        results = {}
+        for name, register in (("per-row", per_row_register), ("bulk", bulk_register)):
+            best = None
+            for _ in range(args.repeat):
+                async with Session() as db:
+                    statements["count"] = 0
+                    started = time.perf_counter()
+                    await register(db, travelogue_id, entries)
+                    elapsed = time.perf_counter() - started
+                    await db.rollback()
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = (best * 1000, statements["count"])
+        (row_ms, row_stmts), (bulk_ms, bulk_stmts) = results["per-row"], results["bulk"]
+        print(f"{size:>7} {row_ms:>11.1f} {row_stmts:>6} {bulk_ms:>9.1f} {bulk_stmts:>6} {row_ms / bulk_ms:>7.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
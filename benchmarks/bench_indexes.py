@@ -0,0 +1,142 @@
+"""인덱스/제약 마이그레이션(hot_query_indexes) 전후 실행 계획과 쿼리 시간 비교
+
+빈 Postgres DB에 trip_to_travel 스키마를 만들고 generate_series로 여행기 --travelogues개,
+여행기당 이미지 --images개(5장 중 1장은 비활성)와 메타데이터/질문 응답/감정을 채운 뒤
+hot_query_indexes의 인덱스와 제약을 뺀 상태(이전)와 migrations.upgrade 적용 후(이후)를 같은 쿼리로 측정
+쿼리마다 EXPLAIN (ANALYZE)을 --repeat번 실행해 서버 실행 시간의 중앙값과 계획 노드를 출력 (네트워크 왕복 제외)
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_indexes.py --url postgresql+asyncpg://postgres@localhost/bench
+    python benchmarks/bench_indexes.py --url ... --travelogues 5000 --images 40 --reset  # 기존 trip_to_travel 스키마 삭제 후 측정
+"""
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base
+from models import TravelogueImage, Purpose, TravelQuestionResponse, ImageQuestionResponse, Emotion, Metadata
+from image_repository import active_images_query
+from migrations import upgrade
+
+# 크기는 정수 인자이므로 SQL에 직접 넣음 (바인드 파라미터끼리의 곱은 타입을 추론하지 못함)
+SEED_STATEMENTS = [
+    "INSERT INTO trip_to_travel.travelogue (id, style_category) SELECT g, 1 + g % 3 FROM generate_series(1, {travelogues}) g",
+    "INSERT INTO trip_to_travel.purpose (travelogue_id, purpose_category) "
+    "SELECT g, 1 + g % 4 FROM generate_series(1, {travelogues}) g, generate_series(1, 2)",
+    "INSERT INTO trip_to_travel.travel_question_response (travelogue_id, who_category) "
+    "SELECT g, 1 + g % 6 FROM generate_series(1, {travelogues}) g",
+    "INSERT INTO trip_to_travel.image (id, travelogue_image_id, uri, is_in_travelogue, has_renditions) "
+    "SELECT g, g, 'gs://bench/' || g || '.jpg', g % 5 <> 0, true FROM generate_series(1, {travelogues} * {images}) g",
+    "INSERT INTO trip_to_travel.travelogue_image (travelogue_id, image_id, captured_at) "
+    "SELECT (g - 1) / {images} + 1, g, timestamp '2024-05-01' + g * interval '1 minute' "
+    "FROM generate_series(1, {travelogues} * {images}) g",
+    "INSERT INTO trip_to_travel.metadata (image_id, created_at, latitude, longitude) "
+    "SELECT g, timestamp '2024-05-01' + g * interval '1 minute', 37.5 + (g % 1000) * 1e-4, 127.0 "
+    "FROM generate_series(1, {travelogues} * {images}) g",
+    "INSERT INTO trip_to_travel.image_question_response (id, image_id, how) "
+    "SELECT g, g, '걸어서' FROM generate_series(1, {travelogues} * {images}) g",
+    "INSERT INTO trip_to_travel.emotion (question_response_id, emotion_category) "
+    "SELECT g, 1 + e FROM generate_series(1, {travelogues} * {images}) g, generate_series(0, 1) e",
+]
+
+# hot_query_indexes에서 추가하는 인덱스/제약 (이전 상태를 만들 때 삭제)
+MIGRATION_INDEXES = [
+    "ix_travelogue_image_image_id", "ix_image_active", "ix_image_question_response_image_id",
+    "ix_emotion_question_response_id", "ix_purpose_travelogue_id", "ix_travel_question_response_travelogue_id",
+]
+
+
+def hot_queries(travelogue_id: int, images: int):
+    # API에서 여행기 하나를 읽을 때 나가는 쿼리들 (image_id 목록은 해당 여행기의 이미지)
+    image_ids = list(range((travelogue_id - 1) * images + 1, travelogue_id * images + 1))
+    return {
+        "active images": active_images_query(travelogue_id, with_metadata=True),
+        "question responses": select(ImageQuestionResponse).where(ImageQuestionResponse.image_id.in_(image_ids)),
+        "emotions": select(Emotion).where(Emotion.question_response_id.in_(image_ids)),
+        "metadata": select(Metadata).where(Metadata.image_id.in_(image_ids)),
+        "capture order": select(TravelogueImage.image_id).where(TravelogueImage.image_id.in_(image_ids)),
+        "purpose": select(Purpose).where(Purpose.travelogue_id == travelogue_id),
+        "who": select(TravelQuestionResponse).where(TravelQuestionResponse.travelogue_id == travelogue_id),
+    }
+
+
+def plan_nodes(plan) -> str:
+    # 계획 트리를 "노드(인덱스)" 목록으로 요약
+    name = plan["Node Type"]
+    if "Index Name" in plan:
+        name += f"({plan['Index Name']})"
+    return " > ".join([name] + [plan_nodes(child) for child in plan.get("Plans", [])])
+
+
+async def measure(engine, args):
+    rng = random.Random(0)
+    travelogue_ids = [rng.randint(1, args.travelogues) for _ in range(args.repeat)]
+    timings, plans = {}, {}
+    async with engine.connect() as conn:
+        for travelogue_id in travelogue_ids:
+            for name, query in hot_queries(travelogue_id, args.images).items():
+                sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                result = (await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))).scalar()
+                result = json.loads(result) if isinstance(result, str) else result
+                timings.setdefault(name, []).append(result[0]["Execution Time"])
+                plans.setdefault(name, plan_nodes(result[0]["Plan"]))
+    return {name: (statistics.median(values), plans[name]) for name, values in timings.items()}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "postgresql+asyncpg://postgres@localhost/postgres"))
+    parser.add_argument("--travelogues", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reset", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Postgres 전용 (EXPLAIN ANALYZE JSON, generate_series 사용)")
+
+    async with engine.begin() as conn:
+        exists = (await conn.execute(text(
+            "SELECT count(*) FROM information_schema.tables WHERE table_schema = 'trip_to_travel'"
+        ))).scalar()
+        if exists and not args.reset:
+            raise SystemExit("trip_to_travel 스키마에 테이블이 있음. 측정용 DB에서 --reset으로 실행")
+        await conn.execute(text("DROP SCHEMA IF EXISTS trip_to_travel CASCADE"))
+        await conn.execute(text("CREATE SCHEMA trip_to_travel"))
+        await conn.run_sync(Base.metadata.create_all)
+        for index_name in MIGRATION_INDEXES:
+            await conn.execute(text(f"DROP INDEX trip_to_travel.{index_name}"))
+        await conn.execute(text("ALTER TABLE trip_to_travel.metadata DROP CONSTRAINT uq_metadata_image_id"))
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement.format(travelogues=args.travelogues, images=args.images)))
+        await conn.execute(text("ANALYZE"))
+
+    print(f"travelogues={args.travelogues} images/travelogue={args.images} repeat={args.repeat}")
+    before = await measure(engine, args)
+    async with engine.connect() as conn:
+        await conn.run_sync(upgrade)
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    after = await measure(engine, args)
+
+    print(f"{'query':<20} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for name, (before_ms, _) in before.items():
+        after_ms = after[name][0]
+        print(f"{name:<20} {before_ms:>10.3f} {after_ms:>9.3f} {before_ms / after_ms:>7.1f}x")
+    print()
+    for name in before:
+        print(f"{name}\n  before: {before[name][1]}\n  after:  {after[name][1]}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""PDF 캡션 줄바꿈 마이크로 벤치마크
+
+  legacy: 글자마다 문자열을 새로 만들고 줄 전체에 pdfmetrics.stringWidth 호출 (줄 길이에 대해 O(n^2))
+  text_layout: 글자 폭 캐시 + 누적 폭, 어절/공백 단위 줄바꿈 (O(n))
+  font: 요청마다 TTFont를 새로 만들던 비용과 등록된 폰트 재사용 비교
+
+사용법 (저장소 루트에서):
+    FONT_PATH=fonts/malgun.ttf python benchmarks/bench_text_layout.py --repeat 200
+"""
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_layout import get_pdf_font, get_glyph_widths, wrap_text, font_path_full, FONT_NAME
+
+FONT_SIZE = 12
+MAX_TEXT_WIDTH = letter[0] * 0.8
+
+KOREAN = "경복궁 돌담길을 따라 천천히 걸으며 가을 햇살을 만끽했다. "
+LATIN = "We walked along the stone wall of Gyeongbokgung enjoying the autumn sun. "
+
+
+def legacy_wrap(text, font_name):
+    wrapped_lines = []
+    for raw_line in text.splitlines():
+        line = ""
+        for char in raw_line:
+            test_line = line + char
+            if pdfmetrics.stringWidth(test_line, font_name, FONT_SIZE) > MAX_TEXT_WIDTH:
+                wrapped_lines.append(line)
+                line = char
+            else:
+                line = test_line
+        wrapped_lines.append(line)
+    return wrapped_lines
+
+
+def make_text(paragraph_chars: int, paragraphs: int = 3) -> str:
+    unit = KOREAN + LATIN
+    paragraph = (unit * (paragraph_chars // len(unit) + 1))[:paragraph_chars]
+    return "\n".join([paragraph] * paragraphs)
+
+
+def bench(stmt, repeat):
+    # 가장 빠른 회차 기준 (호출당 마이크로초)
+    return min(timeit.repeat(stmt, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--sizes", default="200,1000,5000")
+    args = parser.parse_args()
+
+    font = get_pdf_font()
+    widths = get_glyph_widths(font)
+    print(f"font={font_path_full()} max_width={MAX_TEXT_WIDTH:.0f}pt size={FONT_SIZE}")
+
+    print(f"{'chars/para':>10} {'legacy us':>12} {'layout us':>12} {'speedup':>8} {'lines':>12}")
+    for size in map(int, args.sizes.split(",")):
+        text = make_text(size)
+        repeat = max(1, args.repeat * 200 // size)
+        legacy = bench(lambda: legacy_wrap(text, FONT_NAME), repeat)
+        layout = bench(lambda: wrap_text(text, font, FONT_SIZE, MAX_TEXT_WIDTH, widths), repeat)
+        new_lines = wrap_text(text, font, FONT_SIZE, MAX_TEXT_WIDTH, widths)
+        assert all(widths.text_width(line, FONT_SIZE) <= MAX_TEXT_WIDTH for line in new_lines)
+        print(f"{size:>10} {legacy:>12.1f} {layout:>12.1f} {legacy / layout:>7.1f}x "
+              f"{len(legacy_wrap(text, FONT_NAME)):>5} -> {len(new_lines):<5}")
+
+    load = bench(lambda: TTFont("BenchFont", font_path_full()), 3)
+    cached = bench(get_pdf_font, 1000)
+    print(f"font per request {load / 1000:.1f} ms, registered once {cached:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""DB 조회 위주 엔드포인트 동시 요청 부하 테스트
+
+실행 중인 서버에 동시 요청 수(concurrency)를 바꿔 가며 일정 시간 동안 요청을 보내고
+초당 처리량(req/s)과 지연 분포(p50/p95/p99), 실패 수, 측정 중 DB 커넥션 풀 사용량을 출력
+동기 Session(이벤트 루프를 막음)과 비동기 엔진을 비교하려면 각 버전의 서버에 같은 옵션으로 실행
+
+대상 엔드포인트는 GCS/AI 서버를 거치지 않고 DB만 조회하는 것으로 구성 (--travelogue-id의 여행기에 이미지가 있어야 함)
+
+사용법 (저장소 루트에서):
+    python main.py  # 다른 터미널에서 서버 실행
+    python benchmarks/load_test_db.py --base-url http://localhost:8000 --travelogue-id 1 --concurrency 1,8,32,64 --duration 10
+"""
+from collections import Counter
+import aiohttp
+import argparse
+import asyncio
+import itertools
+import time
+
+PATHS = [
+    "/api/travelogue/{tid}",
+    "/api/travelogue/{tid}/draft",
+    "/api/image/{tid}/none/metadata",
+]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def sample_pool(session, base_url, stop, peaks):
+    # 측정 중 커넥션 풀에서 동시에 빌려 간 연결 수의 최댓값 (엔드포인트가 없으면 생략)
+    while not stop.is_set():
+        try:
+            async with session.get(f"{base_url}/api/metrics/database") as resp:
+                if resp.status == 200:
+                    pool = (await resp.json())["pool"]
+                    peaks["checked_out"] = max(peaks.get("checked_out", 0), pool["checked_out"])
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(session, base_url, paths, concurrency, duration):
+    latencies = []
+    statuses = Counter()
+    path_cycle = itertools.cycle(paths)
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            path = next(path_cycle)
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + path) as resp:
+                    await resp.read()
+                    statuses[resp.status] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                statuses["error"] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    peaks = {}
+    sampler = asyncio.ensure_future(sample_pool(session, base_url, stop, peaks))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+
+    latencies.sort()
+    failures = sum(count for status, count in statuses.items() if status != 200)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "failures": failures,
+        "pool_peak": peaks.get("checked_out"),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--travelogue-id", type=int, required=True)
+    parser.add_argument("--concurrency", default="1,8,32,64")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    paths = [path.format(tid=args.travelogue_id) for path in PATHS]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    connector = aiohttp.TCPConnector(limit=max(levels) + 1)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=args.timeout)) as session:
+        for path in paths:
+            async with session.get(base_url + path) as resp:
+                if resp.status != 200:
+                    raise SystemExit(f"{path} -> {resp.status}: {await resp.text()}")
+        await run_level(session, base_url, paths, levels[0], args.warmup)
+
+        print(f"{base_url} duration={args.duration}s paths={len(paths)}")
+        print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fail':>5} {'pool':>5}")
+        for level in levels:
+            result = await run_level(session, base_url, paths, level, args.duration)
+            pool_peak = "-" if result["pool_peak"] is None else result["pool_peak"]
+            print(f"{level:>5} {result['rps']:>9.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} "
+                  f"{result['p99']:>8.1f} {result['failures']:>5} {pool_peak:>5}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Image, TravelogueImage
+
+# 촬영시간순 정렬은 travelogue_image(travelogue_id, captured_at, image_id) 인덱스 순서를 그대로 사용
+# 촬영시간이 없는 이미지는 뒤로, 같은 시간은 image_id 순
+
+
+def capture_order():
+    return TravelogueImage.captured_at.asc().nulls_last(), TravelogueImage.image_id.asc()
+
+
+# 여행기에 포함된(is_in_travelogue) 이미지와 촬영시간을 시간순으로 반환
+async def time_ordered_images(db: AsyncSession, travelogue_id: int) -> List[Tuple[Image, Optional[datetime]]]:
+    return (await db.execute(select(Image, TravelogueImage.captured_at).join(
+        TravelogueImage, TravelogueImage.image_id == Image.id
+    ).where(
+        TravelogueImage.travelogue_id == travelogue_id,
+        Image.is_in_travelogue == True
+    ).order_by(*capture_order()))).all()
+
+
+# 임의의 이미지 id 목록을 시간순으로 정렬 (여행기에 매핑되지 않은 id는 요청 순서대로 뒤에 붙임)
+async def order_image_ids_by_capture(db: AsyncSession, image_ids: List[int]) -> List[int]:
+    rows = (await db.execute(select(TravelogueImage.image_id).where(
+        TravelogueImage.image_id.in_(image_ids)
+    ).order_by(*capture_order()))).all()
+    ordered = list(dict.fromkeys(image_id for image_id, in rows))
+    seen = set(ordered)
+    return ordered + [image_id for image_id in dict.fromkeys(image_ids) if image_id not in seen]
+
+
+# Metadata.created_at을 쓰는 곳에서 함께 호출해 사본을 맞춤 (commit은 호출한 쪽에서)
+# 이미지 수와 무관하게 UPDATE 한 문장을 executemany로 실행하므로, 루프 안에서 부르지 말고 모아서 한 번 호출
+async def set_captured_at(db: AsyncSession, captured_at_map: Dict[int, Optional[datetime]]):
+    if not captured_at_map:
+        return
+    table = TravelogueImage.__table__
+    await db.execute(update(table).where(
+        table.c.image_id == bindparam("target_image_id")
+    ).values(captured_at=bindparam("target_captured_at")), [
+        {"target_image_id": image_id, "target_captured_at": captured_at}
+        for image_id, captured_at in captured_at_map.items()
+    ])
+
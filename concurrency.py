@@ -0,0 +1,151 @@
+from typing import Any, Callable, Deque, Dict, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import time
+
+
+# slot()에서 넘겨받는 작업 정보. 크기를 작업이 끝난 뒤에 알게 되면 (전체 읽기 등) 블록 안에서 size를 채움
+class SlotUsage:
+    def __init__(self, size: Optional[int] = None):
+        self.size = size
+
+
+# AIMD 방식으로 동시 실행 수를 조절하는 limiter
+# - 한도까지 꽉 차서 쓰이는 동안 지연이 기준(baseline) × tolerance 이하이면 한도를 천천히 늘림 (완료당 +1/limit, 한 바퀴에 약 +1)
+# - 실패하거나 지연이 기준을 넘으면 한도를 backoff배로 줄임 (지연 한 번 동안에는 한 번만)
+# 지연이 latency_floor초보다 짧으면 (로컬 디스크, 버퍼에만 쓴 경우 등) 흔들림으로 보고 기준/평균에 넣지 않음
+# baseline은 최근 baseline_window초 ~ 2배 구간의 최소 지연 (네트워크 상태가 바뀌면 따라감)
+# size_unit이 있으면 지연을 (1 + 크기/size_unit)로 나눠 비교 (고정 비용 + 바이트당 전송 시간 모델)
+#   size_unit이 "고정 비용 동안 전송되는 바이트 수" 근처이면 작은 객체와 큰 객체의 정규화 지연이 비슷해져
+#   크기가 섞인 정상 부하를 지연 증가로 오인하지 않음
+# asyncio 객체는 실제로 기다릴 때 만들기 때문에 import 시점(이벤트 루프 밖)에 생성해도 됨
+class AdaptiveLimiter:
+    def __init__(self, name: str, initial: int, min_limit: int = 1, max_limit: int = 64,
+                 tolerance: float = 2.0, backoff: float = 0.7, smoothing: float = 0.2, baseline_window: float = 30.0,
+                 latency_floor: float = 0.005, size_unit: Optional[int] = None,
+                 is_failure: Callable[[BaseException], bool] = lambda e: isinstance(e, Exception)):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self.latency_floor = latency_floor
+        self.size_unit = size_unit
+        self.is_failure = is_failure
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None
+        self._window_min: Optional[float] = None
+        self._previous_window_min: Optional[float] = None
+        self._window_started = 0.0
+        self._last_decrease = 0.0
+        self.stats = {"completed": 0, "errors": 0, "increases": 0, "decreases": 0, "wait_seconds": 0.0}
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            else:
+                # 슬롯을 넘겨받은 직후 취소된 경우 다음 대기자에게 넘김
+                self.release()
+            raise
+        finally:
+            self.stats["wait_seconds"] += time.monotonic() - started
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _decrease(self, now: float):
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        new_limit = max(self.min_limit, self.limit * self.backoff)
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.stats["decreases"] += 1
+
+    def _normalize(self, latency: float, size: Optional[int]) -> float:
+        if self.size_unit and size:
+            return latency / (1 + size / self.size_unit)
+        return latency
+
+    def _record(self, latency: float, failed: bool, size: Optional[int] = None):
+        now = time.monotonic()
+        self.stats["completed"] += 1
+        if failed:
+            self.stats["errors"] += 1
+            self._decrease(now)
+            return
+        latency = self._normalize(latency, size)
+        if latency >= self.latency_floor:
+            self._latency = latency if self._latency is None else (
+                (1 - self.smoothing) * self._latency + self.smoothing * latency
+            )
+            if now - self._window_started > self.baseline_window or self._window_min is None:
+                self._previous_window_min, self._window_min = self._window_min, latency
+                self._window_started = now
+            else:
+                self._window_min = min(self._window_min, latency)
+        if self._latency is not None and self._latency > max(self.baseline * self.tolerance, self.latency_floor):
+            self._decrease(now)
+        elif self.in_flight >= int(self.limit) and self.limit < self.max_limit:
+            # 한도가 실제로 병목일 때만 늘림
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.stats["increases"] += 1
+            self._wake()
+
+    @property
+    def baseline(self) -> Optional[float]:
+        if self._previous_window_min is None:
+            return self._window_min
+        return min(self._window_min, self._previous_window_min)
+
+    # size: 작업이 주고받는 바이트 수 (모르면 None, 블록 안에서 usage.size로 나중에 채워도 됨)
+    @asynccontextmanager
+    async def slot(self, size: Optional[int] = None):
+        await self.acquire()
+        usage = SlotUsage(size)
+        started = time.monotonic()
+        try:
+            yield usage
+        except BaseException as e:
+            if self.is_failure(e):
+                self._record(time.monotonic() - started, failed=True)
+            raise
+        else:
+            self._record(time.monotonic() - started, failed=False, size=usage.size)
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "latency_ms": round(self._latency * 1000, 1) if self._latency is not None else None,
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            **self.stats,
+        }
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 
 # 환경변수 로드
 load_dotenv()
@@ -12,11 +13,53 @@ HOST = os.getenv("host")
 PORT = os.getenv("port")
 DBNAME = os.getenv("dbname")
 
-DATABASE_URL = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?sslmode=require"
+# 커넥션 풀 설정: 동시에 쓰는 연결은 최대 pool_size + max_overflow개, 그 이상은 pool_timeout초까지 대기 후 실패
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+# 쿼리 하나의 최대 실행 시간 (초)
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", 60))
+# prepared statement 캐시 크기. 트랜잭션 모드 풀러(Supabase 6543 포트, pgbouncer)를 거치면 0으로 설정
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+
+DATABASE_URL = (
+    f"postgresql+asyncpg://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}"
+    f"?prepared_statement_cache_size={DB_STATEMENT_CACHE_SIZE}"
+)
 
 # SQLAlchemy 설정
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=3600)
+# 쿼리가 이벤트 루프를 막지 않도록 asyncpg 비동기 엔진 사용
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    connect_args={
+        "ssl": "require",
+        "command_timeout": DB_COMMAND_TIMEOUT,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    },
+)
 metadata = MetaData(schema="trip_to_travel")
 Base = declarative_base(metadata=metadata)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+# commit 후 속성 접근 시 지연 로딩(비동기에서는 불가)이 일어나지 않도록 expire_on_commit=False
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def get_pool_metrics():
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+async def close_database():
+    await engine.dispose()
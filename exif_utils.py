@@ -0,0 +1,238 @@
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime
+import io
+import exifread
+
+DATETIME_TAGS = ("EXIF DateTimeOriginal", "Image DateTime")
+
+
+def convert_to_degrees(value) -> float:
+    d = float(value.values[0].num) / float(value.values[0].den)
+    m = float(value.values[1].num) / float(value.values[1].den)
+    s = float(value.values[2].num) / float(value.values[2].den)
+    return d + (m / 60.0) + (s / 3600.0)
+
+
+def parse_created_at(tags) -> Optional[datetime]:
+    for tag in DATETIME_TAGS:
+        if tag in tags:
+            try:
+                return datetime.strptime(str(tags[tag]), "%Y:%m:%d %H:%M:%S")
+            except Exception:
+                continue
+    return None
+
+
+def parse_gps(tags) -> Dict[str, Optional[float]]:
+    gps_latitude = tags.get("GPS GPSLatitude")
+    gps_latitude_ref = tags.get("GPS GPSLatitudeRef")
+    gps_longitude = tags.get("GPS GPSLongitude")
+    gps_longitude_ref = tags.get("GPS GPSLongitudeRef")
+    if not (gps_latitude and gps_latitude_ref and gps_longitude and gps_longitude_ref):
+        return {"latitude": None, "longitude": None}
+    try:
+        lat = convert_to_degrees(gps_latitude)
+        lon = convert_to_degrees(gps_longitude)
+    except (ZeroDivisionError, IndexError, AttributeError):
+        return {"latitude": None, "longitude": None}
+    if gps_latitude_ref.values != 'N':
+        lat = -lat
+    if gps_longitude_ref.values != 'E':
+        lon = -lon
+    return {"latitude": lat, "longitude": lon}
+
+
+def parse_orientation(tags) -> Optional[int]:
+    orientation = tags.get("Image Orientation")
+    if orientation is None:
+        return None
+    try:
+        return int(orientation.values[0])
+    except (IndexError, TypeError, ValueError):
+        return None
+
+
+def parse_exif_tags(tags) -> Dict[str, Any]:
+    gps = parse_gps(tags)
+    return {
+        "created_at": parse_created_at(tags),
+        "latitude": gps["latitude"],
+        "longitude": gps["longitude"],
+        "orientation": parse_orientation(tags),
+    }
+
+
+# 업로드 시점에 메모리에 있는 바이트에서 촬영시간/GPS/회전 정보를 한 번만 추출
+def extract_metadata_from_bytes(image_bytes: bytes) -> Dict[str, Any]:
+    try:
+        tags = exifread.process_file(io.BytesIO(image_bytes), details=False)
+    except Exception:
+        tags = {}
+    return parse_exif_tags(tags)
+
+
+# 업로드 중 임시 파일로 받아 둔 이미지에서 추출 (exifread는 필요한 부분만 seek해서 읽음)
+def extract_metadata_from_file(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as f:
+            tags = exifread.process_file(f, details=False)
+    except Exception:
+        tags = {}
+    return parse_exif_tags(tags)
+
+
+# ---- 헤더 범위 읽기용 EXIF 블록 위치 탐색 (JPEG APP1 / HEIC Exif item) ----
+
+class IncompleteHeader(Exception):
+    def __init__(self, needed: int):
+        super().__init__(f"need {needed} bytes of header")
+        self.needed = needed
+
+
+def detect_image_format(header: bytes) -> Optional[str]:
+    if header[:2] == b"\xff\xd8":
+        return "jpeg"
+    if header[4:8] == b"ftyp":
+        return "heic"
+    return None
+
+
+def _locate_jpeg_exif(header: bytes) -> Optional[Tuple[int, int]]:
+    pos = 2
+    while True:
+        if pos + 4 > len(header):
+            raise IncompleteHeader(pos + 4)
+        if header[pos] != 0xFF:
+            return None
+        marker = header[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            pos += 2
+            continue
+        # SOS/EOI 이후에는 EXIF가 없음
+        if marker in (0xDA, 0xD9):
+            return None
+        seg_end = pos + 2 + int.from_bytes(header[pos + 2:pos + 4], "big")
+        if marker == 0xE1:
+            if pos + 10 > len(header):
+                raise IncompleteHeader(pos + 10)
+            if header[pos + 4:pos + 10] == b"Exif\x00\x00":
+                # exifread가 JPEG로 인식하도록 SOI부터 APP1 끝까지 사용
+                return 0, seg_end
+        pos = seg_end
+
+
+def _iter_boxes(data: bytes, start: int, end: int):
+    pos = start
+    while pos + 8 <= end:
+        size = int.from_bytes(data[pos:pos + 4], "big")
+        box_type = data[pos + 4:pos + 8]
+        header_size = 8
+        if size == 1:
+            if pos + 16 > end:
+                raise IncompleteHeader(pos + 16)
+            size = int.from_bytes(data[pos + 8:pos + 16], "big")
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+
+def _read_uint(data: bytes, pos: int, size: int) -> Tuple[int, int]:
+    return int.from_bytes(data[pos:pos + size], "big"), pos + size
+
+
+def _find_heic_exif_item(data: bytes, start: int, end: int) -> Optional[int]:
+    version = data[start]
+    pos = start + 4
+    _, pos = _read_uint(data, pos, 2 if version == 0 else 4)
+    for box_type, body_start, body_end in _iter_boxes(data, pos, end):
+        if box_type != b"infe":
+            continue
+        infe_version = data[body_start]
+        if infe_version < 2:
+            continue
+        p = body_start + 4
+        item_id, p = _read_uint(data, p, 2 if infe_version == 2 else 4)
+        p += 2
+        if data[p:p + 4] == b"Exif":
+            return item_id
+    return None
+
+
+def _find_heic_item_extent(data: bytes, start: int, end: int, target_id: int) -> Optional[Tuple[int, int]]:
+    version = data[start]
+    pos = start + 4
+    offset_size = data[pos] >> 4
+    length_size = data[pos] & 0x0F
+    base_offset_size = data[pos + 1] >> 4
+    index_size = data[pos + 1] & 0x0F if version in (1, 2) else 0
+    pos += 2
+    item_count, pos = _read_uint(data, pos, 2 if version < 2 else 4)
+    for _ in range(item_count):
+        item_id, pos = _read_uint(data, pos, 2 if version < 2 else 4)
+        construction_method = 0
+        if version in (1, 2):
+            construction_method, pos = _read_uint(data, pos, 2)
+            construction_method &= 0x0F
+        pos += 2  # data_reference_index
+        base_offset, pos = _read_uint(data, pos, base_offset_size)
+        extent_count, pos = _read_uint(data, pos, 2)
+        extents = []
+        for _ in range(extent_count):
+            pos += index_size
+            extent_offset, pos = _read_uint(data, pos, offset_size)
+            extent_length, pos = _read_uint(data, pos, length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+        if item_id == target_id:
+            # idat 내부 저장이나 분할 extent는 지원하지 않음
+            if construction_method != 0 or len(extents) != 1:
+                return None
+            offset, length = extents[0]
+            return offset, offset + length
+    return None
+
+
+def _locate_heic_exif(header: bytes) -> Optional[Tuple[int, int]]:
+    for box_type, body_start, body_end in _iter_boxes(header, 0, len(header)):
+        if box_type != b"meta":
+            continue
+        if body_end > len(header):
+            raise IncompleteHeader(body_end)
+        children = {t: (s, e) for t, s, e in _iter_boxes(header, body_start + 4, body_end)}
+        if b"iinf" not in children or b"iloc" not in children:
+            return None
+        item_id = _find_heic_exif_item(header, *children[b"iinf"])
+        if item_id is None:
+            return None
+        return _find_heic_item_extent(header, *children[b"iloc"], item_id)
+    # meta 박스를 아직 못 찾음
+    raise IncompleteHeader(len(header) + 1)
+
+
+# header 안에서 exifread로 파싱할 EXIF 블록의 (start, end) 범위 반환
+# 블록이 잘려 있거나 아직 찾지 못했으면 IncompleteHeader 발생
+def locate_exif_block(header: bytes) -> Optional[Tuple[int, int]]:
+    image_format = detect_image_format(header)
+    if image_format == "jpeg":
+        return _locate_jpeg_exif(header)
+    if image_format == "heic":
+        return _locate_heic_exif(header)
+    return None
+
+
+def parse_exif_block(image_format: str, block: bytes) -> Dict[str, Any]:
+    if image_format == "heic":
+        # Exif item은 4바이트 TIFF 헤더 오프셋으로 시작
+        tiff_offset = int.from_bytes(block[:4], "big")
+        block = block[4 + tiff_offset:]
+    try:
+        tags = exifread.process_file(io.BytesIO(block), details=False)
+    except Exception:
+        tags = {}
+    return parse_exif_tags(tags)
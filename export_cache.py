@@ -0,0 +1,224 @@
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from datetime import datetime
+from storage_backends import StorageNotFound
+from image_prep import PDF_IMAGE_MODE
+from gcs_utils import read_blob, write_blob, write_blob_from_file, blob_exists, delete_image_from_gcs
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# PDF 레이아웃(여백, 폰트 크기, 줄바꿈 규칙 등)을 바꾸면 올려서 기존 캐시를 무효화
+PDF_LAYOUT_VERSION = 2
+
+# 로컬 디스크 캐시 (지문 기반 파일명). 빈 값이면 비활성화
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", "export_cache")
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# 클라이언트/저장소로 내보낼 때의 청크 크기
+EXPORT_STREAM_CHUNK = int(os.getenv("EXPORT_STREAM_CHUNK", 256 * 1024))
+
+export_cache_stats = {"local_hits": 0, "gcs_hits": 0, "misses": 0}
+# 캐시 miss로 새로 만든 PDF의 크기/생성 시간 (image_mode 비교용)
+export_render_stats = {"renders": 0, "pages": 0, "bytes": 0, "seconds": 0.0, "last": None}
+
+
+def record_export_render(pages: int, size: int, seconds: float):
+    export_render_stats["renders"] += 1
+    export_render_stats["pages"] += pages
+    export_render_stats["bytes"] += size
+    export_render_stats["seconds"] += seconds
+    export_render_stats["last"] = {"pages": pages, "bytes": size, "seconds": round(seconds, 3)}
+
+
+def get_export_cache_metrics() -> Dict[str, Any]:
+    total = sum(export_cache_stats.values())
+    hits = export_cache_stats["local_hits"] + export_cache_stats["gcs_hits"]
+    renders = export_render_stats["renders"]
+    pages = export_render_stats["pages"]
+    return {
+        **export_cache_stats,
+        "hit_rate": hits / total if total else 0.0,
+        "render": {
+            "image_mode": PDF_IMAGE_MODE,
+            "renders": renders,
+            "avg_bytes_per_page": export_render_stats["bytes"] / pages if pages else 0,
+            "avg_seconds": export_render_stats["seconds"] / renders if renders else 0.0,
+            "last": export_render_stats["last"],
+        },
+    }
+
+
+def export_pdf_name(travelogue_id: int) -> str:
+    return f"exports/travelogue_{travelogue_id}.pdf"
+
+
+def export_fingerprint_name(travelogue_id: int) -> str:
+    return f"exports/travelogue_{travelogue_id}.sha256"
+
+
+# 지문: 페이지 순서대로의 (이미지, final 텍스트, 촬영시간) + 폰트 + 레이아웃 버전
+def export_fingerprint(pages: List[Tuple[int, str, Optional[str], Optional[datetime]]], font_path: str) -> str:
+    try:
+        font_id = [os.path.basename(font_path), os.path.getsize(font_path)]
+    except OSError:
+        font_id = [os.path.basename(font_path), None]
+    payload = {
+        "layout": PDF_LAYOUT_VERSION,
+        "image_mode": PDF_IMAGE_MODE,
+        "font": font_id,
+        "pages": [
+            [image_id, uri, final or "", created_at.isoformat() if created_at else None]
+            for image_id, uri, final, created_at in pages
+        ],
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _local_path(fingerprint: str) -> str:
+    return os.path.join(EXPORT_CACHE_DIR, f"{fingerprint}.pdf")
+
+
+def _open_local(fingerprint: str):
+    if not EXPORT_CACHE_DIR:
+        return None
+    try:
+        f = open(_local_path(fingerprint), "rb")
+    except FileNotFoundError:
+        return None
+    # 최근 사용 시각을 갱신해 정리 시 오래된 것부터 지워지도록 함
+    try:
+        os.utime(_local_path(fingerprint))
+    except FileNotFoundError:
+        pass
+    return f
+
+
+def _evict_local():
+    entries = []
+    for entry in os.scandir(EXPORT_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= EXPORT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# 생성 중인 PDF를 임시 파일에 기록하고, 완료되면 로컬 캐시 파일로 교체(rename)
+class ExportSpool:
+    def __init__(self):
+        directory = EXPORT_CACHE_DIR or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"export.{os.getpid()}.{time.monotonic_ns()}.tmp")
+        self._file = open(self.path, "wb")
+        self.size = 0
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, fingerprint: str):
+        self.close()
+        if not EXPORT_CACHE_DIR:
+            self.discard()
+            return
+        os.replace(self.path, _local_path(fingerprint))
+        _evict_local()
+
+
+async def iter_file(f, chunk_size: int = EXPORT_STREAM_CHUNK) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+# 범위 읽기로 조금씩 받아 임시 파일에 모은 뒤 그 파일을 스트리밍
+# 응답을 시작하기 전에 끝까지 받아 두므로 저장소 오류는 잘린 PDF가 아니라 오류 응답이 됨
+async def _download_remote(travelogue_id: int, fingerprint: str) -> AsyncIterator[bytes]:
+    spool = ExportSpool()
+    try:
+        offset = 0
+        while True:
+            chunk = await read_blob(export_pdf_name(travelogue_id), offset, offset + EXPORT_STREAM_CHUNK)
+            if chunk:
+                await asyncio.to_thread(spool.write, chunk)
+            offset += len(chunk)
+            if len(chunk) < EXPORT_STREAM_CHUNK:
+                break
+        spool.close()
+        f = await asyncio.to_thread(open, spool.path, "rb")
+    except BaseException:
+        spool.discard()
+        raise
+    # 열린 파일은 이름이 바뀌거나 지워져도 읽을 수 있으므로 바로 로컬 캐시로 옮김 (캐시가 꺼져 있으면 삭제)
+    try:
+        await asyncio.to_thread(spool.publish, fingerprint)
+    except BaseException:
+        f.close()
+        spool.discard()
+        raise
+    return iter_file(f)
+
+
+async def _read_stored_fingerprint(travelogue_id: int) -> Optional[str]:
+    try:
+        return bytes(await read_blob(export_fingerprint_name(travelogue_id))).decode().strip()
+    except StorageNotFound:
+        return None
+
+
+# 캐시된 PDF의 청크 스트림과 출처(local/gcs)를 반환, 없으면 (None, None)
+# 저장소의 지문이 다르면 로컬 사본을 저장소에 다시 올려 공유 링크가 항상 최신 PDF를 가리키게 함
+async def open_cached_export(travelogue_id: int, fingerprint: str) -> Tuple[Optional[AsyncIterator[bytes]], Optional[str]]:
+    stored_fingerprint = await _read_stored_fingerprint(travelogue_id)
+    local_file = await asyncio.to_thread(_open_local, fingerprint)
+    if local_file is not None:
+        if stored_fingerprint != fingerprint:
+            await _write_remote(travelogue_id, fingerprint, local_file.name)
+        export_cache_stats["local_hits"] += 1
+        return iter_file(local_file), "local"
+
+    if stored_fingerprint == fingerprint and await blob_exists(export_pdf_name(travelogue_id)):
+        export_cache_stats["gcs_hits"] += 1
+        return await _download_remote(travelogue_id, fingerprint), "gcs"
+
+    export_cache_stats["misses"] += 1
+    return None, None
+
+
+async def _write_remote(travelogue_id: int, fingerprint: str, path: str):
+    # 지문을 지우고 PDF를 쓴 다음 새 지문을 써서, 지문과 PDF가 어긋난 상태로 읽히지 않도록 함
+    await delete_image_from_gcs(export_fingerprint_name(travelogue_id))
+    await write_blob_from_file(export_pdf_name(travelogue_id), path, content_type="application/pdf")
+    await write_blob(export_fingerprint_name(travelogue_id), fingerprint.encode(), content_type="text/plain")
+
+
+async def store_export(travelogue_id: int, fingerprint: str, spool: ExportSpool):
+    spool.close()
+    await _write_remote(travelogue_id, fingerprint, spool.path)
+    await asyncio.to_thread(spool.publish, fingerprint)
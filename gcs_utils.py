@@ -1,62 +1,190 @@
-from google.cloud import storage
-from typing import Optional, Dict, Any
-from google.oauth2 import service_account
-from datetime import timedelta, datetime
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from cachetools import TLRUCache
 import os
-import io
-import exifread
+import time
 import asyncio
+from exif_utils import (
+    IncompleteHeader, detect_image_format, locate_exif_block, parse_exif_block, parse_exif_tags,
+    extract_metadata_from_bytes
+)
+from concurrency import AdaptiveLimiter
+from storage_backends import StorageBackend, GCSStorage, InMemoryStorage, LocalStorage, StorageNotFound
 
 BUCKET_NAME = "trip_to_travel_bucket"
 
-credentials_info = {
-    "type": "service_account",
-    "project_id": os.environ["GOOGLE_PROJECT_ID"],
-    "private_key_id": os.environ["GOOGLE_PRIVATE_KEY_ID"],
-    "private_key": os.environ["GOOGLE_PRIVATE_KEY"].replace('\\n', '\n'),
-    "client_email": os.environ["GOOGLE_CLIENT_EMAIL"],
-    "client_id": os.environ["GOOGLE_CLIENT_ID"],
-    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-    "token_uri": "https://oauth2.googleapis.com/token",
-    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-    "client_x509_cert_url": os.environ["GOOGLE_CLIENT_X509_CERT_URL"]
-}
+# gcs: 실제 GCS, local: 로컬 디스크(mmap), memory: 프로세스 내 가짜 저장소 (부하 테스트용)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "gcs")
+
+def create_storage_backend(kind: str) -> StorageBackend:
+    if kind == "memory":
+        return InMemoryStorage(BUCKET_NAME, latency=float(os.getenv("STORAGE_FAKE_LATENCY", 0)))
+    if kind == "local":
+        return LocalStorage(
+            BUCKET_NAME,
+            root=os.getenv("LOCAL_STORAGE_ROOT", "local_storage"),
+            base_url=os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000"),
+            secret=os.getenv("LOCAL_STORAGE_SECRET", "local-storage-secret"),
+        )
+    if kind == "gcs":
+        return GCSStorage(BUCKET_NAME)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
+
+storage_backend = create_storage_backend(STORAGE_BACKEND)
+
+
+def get_storage():
+    return storage_backend
+
+def set_storage(backend):
+    global storage_backend
+    storage_backend = backend
+
+async def close_storage():
+    await storage_backend.close()
+
+
+# 저장소 I/O 동시 실행 수: 읽기/쓰기/삭제별 AIMD limiter (concurrency.AdaptiveLimiter)
+# 지연이 늘거나 오류가 나면 한도를 줄이고, 한도가 병목인 동안 지연이 안정적이면 늘림
+# StorageNotFound는 정상 응답이므로 실패로 보지 않음
+# EXIF 범위 읽기와 원본 다운로드, 썸네일과 원본 업로드가 같은 한도를 쓰므로 지연은 작업 크기로 정규화해 비교
+# (STORAGE_LATENCY_SIZE_UNIT: 요청 하나의 고정 비용 동안 전송되는 바이트 수에 가깝게 설정)
+STORAGE_LATENCY_SIZE_UNIT = int(os.getenv("STORAGE_LATENCY_SIZE_UNIT", 1024 * 1024))
+
+def _storage_limiter(kind: str, initial: int, max_limit: int) -> AdaptiveLimiter:
+    prefix = f"STORAGE_{kind.upper()}"
+    return AdaptiveLimiter(
+        kind,
+        initial=int(os.getenv(f"{prefix}_CONCURRENCY", initial)),
+        min_limit=int(os.getenv(f"{prefix}_CONCURRENCY_MIN", 1)),
+        max_limit=int(os.getenv(f"{prefix}_CONCURRENCY_MAX", max_limit)),
+        tolerance=float(os.getenv("STORAGE_LATENCY_TOLERANCE", 2.0)),
+        size_unit=STORAGE_LATENCY_SIZE_UNIT,
+        is_failure=lambda e: isinstance(e, Exception) and not isinstance(e, StorageNotFound),
+    )
 
-credentials = service_account.Credentials.from_service_account_info(credentials_info)
-storage_client = storage.Client(credentials=credentials, project=credentials_info["project_id"])
-bucket = storage_client.bucket(BUCKET_NAME)
+storage_limits = {
+    "read": _storage_limiter("read", initial=16, max_limit=64),
+    "write": _storage_limiter("write", initial=5, max_limit=32),
+    "delete": _storage_limiter("delete", initial=8, max_limit=32),
+}
 
-# 동시 업로드 수 제한 (5개)
-UPLOAD_CONCURRENCY_LIMIT = 5
-upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY_LIMIT)
+def get_storage_concurrency_metrics() -> Dict[str, Any]:
+    return {kind: limiter.metrics() for kind, limiter in storage_limits.items()}
 
 async def upload_image_to_gcs(file_bytes, file_name: str, content_type: Optional[str] = "image/jpeg") -> str:
-    async with upload_semaphore:
-        def _upload():
-            blob = bucket.blob(file_name)
-            blob.upload_from_string(file_bytes, content_type=content_type)
-            return f"gs://{BUCKET_NAME}/{file_name}"
-        
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, _upload)
-
-def delete_image_from_gcs(file_name: str) -> bool:
-    blob = bucket.blob(file_name)
-    if blob.exists():
-        blob.delete()
-        return True
-    else:
-        return False
-    
-def generate_signed_url(image_uri: str, expiration: int = 3600) -> str:
-    file_name = image_uri.split(f"gs://{BUCKET_NAME}/")[-1]
-    print(file_name)
-    blob = bucket.blob(file_name)
-    return blob.generate_signed_url(
-        version="v4",
-        expiration=timedelta(seconds=expiration),
-        method="GET"
-    )
+    async with storage_limits["write"].slot(size=len(file_bytes)):
+        return await storage_backend.write(file_name, file_bytes, content_type=content_type)
+
+# 업로드 요청 본문(UploadFile)에서 한 번에 읽는 크기
+# 파일 하나가 메모리에 두는 양은 이 청크 + 저장소 쓰기 버퍼(GCS_RESUMABLE_CHUNK)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 256 * 1024))
+# 동시에 열어 두는 업로드 스트림(writer) 수: 업로드 메모리는 (청크 + 쓰기 버퍼) × 이 값으로 제한됨
+# 쓰기 limiter는 저장소 호출 동안만 슬롯을 잡으므로 열린 스트림 수는 따로 제한
+UPLOAD_STREAM_CONCURRENCY = int(os.getenv("UPLOAD_STREAM_CONCURRENCY", 8))
+upload_stream_semaphore = asyncio.Semaphore(UPLOAD_STREAM_CONCURRENCY)
+
+# source(async read(n)을 가진 객체)를 청크 단위로 저장소에 업로드, tee가 있으면 같은 청크를 파일에도 기록
+# 스트림 슬롯(upload_stream_semaphore)은 open_writer부터 close까지 잡고,
+# 쓰기 슬롯은 저장소 호출(open/write/close) 동안만 잡음: 클라이언트가 본문을 느리게 보내는 시간은 저장소 지연이 아님
+async def upload_stream_to_gcs(source, file_name: str, content_type: Optional[str] = "image/jpeg", tee=None) -> str:
+    limiter = storage_limits["write"]
+    async with upload_stream_semaphore:
+        async with limiter.slot():
+            writer = await storage_backend.open_writer(file_name, content_type=content_type)
+        try:
+            while True:
+                chunk = await source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if tee is not None:
+                    await asyncio.to_thread(tee.write, chunk)
+                async with limiter.slot() as usage:
+                    sent = writer.sent
+                    await writer.write(chunk)
+                    usage.size = writer.sent - sent
+            async with limiter.slot() as usage:
+                sent = writer.sent
+                uri = await writer.close()
+                usage.size = writer.sent - sent
+            return uri
+        except BaseException:
+            await writer.abort()
+            raise
+
+async def delete_image_from_gcs(file_name: str) -> bool:
+    invalidate_signed_urls(file_name)
+    async with storage_limits["delete"].slot():
+        return await storage_backend.delete(file_name)
+
+async def blob_exists(file_name: str) -> bool:
+    async with storage_limits["read"].slot():
+        return await storage_backend.exists(file_name)
+
+async def read_blob(file_name: str, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+    async with storage_limits["read"].slot() as usage:
+        data = await storage_backend.read(file_name, start, end)
+        usage.size = len(data)
+        return data
+
+async def write_blob(file_name: str, data: bytes, content_type: Optional[str] = None) -> str:
+    async with storage_limits["write"].slot(size=len(data)):
+        return await storage_backend.write(file_name, data, content_type=content_type)
+
+async def write_blob_from_file(file_name: str, path: str, content_type: Optional[str] = None) -> str:
+    async with storage_limits["write"].slot(size=os.path.getsize(path)):
+        return await storage_backend.write_file(file_name, path, content_type=content_type)
+
+# 서명 URL 캐시: (파일명, method) 기준으로 만료 직전까지 재사용
+SIGNED_URL_CACHE_SIZE = int(os.getenv("SIGNED_URL_CACHE_SIZE", 10000))
+SIGNED_URL_REFRESH_MARGIN = int(os.getenv("SIGNED_URL_REFRESH_MARGIN", 600))
+
+signed_url_cache = TLRUCache(
+    maxsize=SIGNED_URL_CACHE_SIZE,
+    ttu=lambda _key, value, now: now + value[1],
+    timer=time.monotonic
+)
+signed_url_cache_stats = {"hits": 0, "misses": 0}
+
+def get_signed_url_cache_metrics() -> Dict[str, Any]:
+    total = signed_url_cache_stats["hits"] + signed_url_cache_stats["misses"]
+    return {
+        **signed_url_cache_stats,
+        "hit_rate": signed_url_cache_stats["hits"] / total if total else 0.0,
+        "size": len(signed_url_cache),
+        "maxsize": signed_url_cache.maxsize,
+    }
+
+def invalidate_signed_urls(file_name: str):
+    for key in [key for key in list(signed_url_cache.keys()) if key[0] == file_name]:
+        signed_url_cache.pop(key, None)
+
+async def generate_signed_urls(image_uris: List[str], expiration: int = 3600, method: str = "GET") -> List[str]:
+    file_names = [extract_gcs_file_name(uri) for uri in image_uris]
+    urls = {}
+    missing = []
+    for file_name in file_names:
+        if file_name in urls or file_name in missing:
+            continue
+        cached = signed_url_cache.get((file_name, method))
+        if cached is not None:
+            signed_url_cache_stats["hits"] += 1
+            urls[file_name] = cached[0]
+        else:
+            signed_url_cache_stats["misses"] += 1
+            missing.append(file_name)
+
+    if missing:
+        signed = await storage_backend.sign_many(missing, expiration=expiration, method=method)
+        ttl = expiration - SIGNED_URL_REFRESH_MARGIN
+        for file_name, url in zip(missing, signed):
+            urls[file_name] = url
+            if ttl > 0:
+                signed_url_cache[(file_name, method)] = (url, ttl)
+    return [urls[file_name] for file_name in file_names]
+
+async def generate_signed_url(image_uri: str, expiration: int = 3600) -> str:
+    return (await generate_signed_urls([image_uri], expiration=expiration))[0]
 
 def extract_gcs_file_name(image_uri: str) -> str:
     prefix = f"gs://{BUCKET_NAME}/"
@@ -64,63 +192,63 @@ def extract_gcs_file_name(image_uri: str) -> str:
         return image_uri[len(prefix):]
     return image_uri
 
-def extract_datetime_location_from_gcs(image_uri: str) -> Dict[str, Optional[Any]]:
-    file_name = extract_gcs_file_name(image_uri)
-    blob = bucket.blob(file_name)
-    image_bytes = blob.download_as_bytes()
-    stream = io.BytesIO(image_bytes)
-    tags = exifread.process_file(stream, details=True)
-
-    created_at = None
-    for tag in ("EXIF DateTimeOriginal", "Image DateTime"):
-        if tag in tags:
-            try:
-                created_at = datetime.strptime(str(tags[tag]), "%Y:%m:%d %H:%M:%S")
-            except Exception:
-                created_at = None
-            break
+# EXIF 헤더 범위 읽기 설정 (처음엔 헤더 일부만, 블록이 잘렸을 때만 추가로 읽음)
+EXIF_RANGE_CHUNK = int(os.getenv("EXIF_RANGE_CHUNK", 64 * 1024))
+EXIF_RANGE_LIMIT = int(os.getenv("EXIF_RANGE_LIMIT", 1024 * 1024))
 
-    gps_latitude = tags.get("GPS GPSLatitude")
-    gps_latitude_ref = tags.get("GPS GPSLatitudeRef")
-    gps_longitude = tags.get("GPS GPSLongitude")
-    gps_longitude_ref = tags.get("GPS GPSLongitudeRef")
+async def read_exif_metadata_from_gcs(file_name: str, ranged: bool = True) -> Dict[str, Optional[Any]]:
+    if not ranged:
+        return extract_metadata_from_bytes(await read_blob(file_name))
 
-    return {
-        "created_at": created_at,
-        "gps_latitude": gps_latitude,
-        "gps_latitude_ref": gps_latitude_ref,
-        "gps_longitude": gps_longitude,
-        "gps_longitude_ref": gps_longitude_ref,
-    }
+    header = bytes(await read_blob(file_name, 0, EXIF_RANGE_CHUNK))
+    eof = len(header) < EXIF_RANGE_CHUNK
+    image_format = detect_image_format(header)
+    if image_format is None:
+        # 범위 읽기를 지원하지 않는 포맷은 전체 다운로드
+        return extract_metadata_from_bytes(header if eof else await read_blob(file_name))
 
+    while True:
+        try:
+            block = locate_exif_block(header)
+            break
+        except IncompleteHeader as e:
+            if eof:
+                block = None
+                break
+            if e.needed > EXIF_RANGE_LIMIT:
+                return extract_metadata_from_bytes(await read_blob(file_name))
+            end = max(e.needed, len(header) + EXIF_RANGE_CHUNK)
+            header += await read_blob(file_name, len(header), end)
+            eof = len(header) < end
+
+    if block is None:
+        return parse_exif_tags({})
+    start, end = block
+    if end <= len(header):
+        data = header[start:end]
+    elif start >= len(header):
+        data = await read_blob(file_name, start, end)
+    else:
+        # EXIF 블록이 잘린 경우 부족한 부분만 추가로 읽음
+        header += await read_blob(file_name, len(header), end)
+        data = header[start:end]
+    return parse_exif_block(image_format, data)
 
+async def extract_datetime_location_from_gcs(image_uri: str, ranged: bool = True) -> Dict[str, Optional[Any]]:
+    file_name = extract_gcs_file_name(image_uri)
+    return await read_exif_metadata_from_gcs(file_name, ranged=ranged)
 
-def extract_created_at_from_gcs(image_path: str) -> datetime:
+
+async def extract_created_at_from_gcs(image_path: str, ranged: bool = True) -> datetime:
     file_name = extract_gcs_file_name(image_path)
-    blob = bucket.blob(file_name)
-    if not blob.exists():
+    try:
+        return (await read_exif_metadata_from_gcs(file_name, ranged=ranged))["created_at"]
+    except StorageNotFound:
         return None
-    image_bytes = blob.download_as_bytes()
-    stream = io.BytesIO(image_bytes)
-    tags = exifread.process_file(stream, details=False)
-    for tag in ("EXIF DateTimeOriginal", "Image DateTime"):
-        if tag in tags:
-            try:
-                return datetime.strptime(str(tags[tag]), "%Y:%m:%d %H:%M:%S")
-            except Exception:
-                continue
-    return None
-
-def upload_pdf_and_generate_url(file_path: str, travelogue_id: int) -> str:
+
+async def upload_pdf_and_generate_url(file_path: str, travelogue_id: int) -> str:
     file_name = f"exports/travelogue_{travelogue_id}.pdf"
     with open(file_path, "rb") as f:
         file_bytes = f.read()
-    blob = bucket.blob(file_name)
-    blob.upload_from_string(file_bytes, content_type="application/pdf")
-
-    url = blob.generate_signed_url(
-        version="v4",
-        expiration=timedelta(hours=1),
-        method="GET"
-    )
-    return url
+    await write_blob(file_name, file_bytes, content_type="application/pdf")
+    return await generate_signed_url(file_name, expiration=3600)
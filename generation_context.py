@@ -0,0 +1,71 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import JSON, and_, exists, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import (Travelogue, TravelogueImage, Image, Metadata, ImageQuestionResponse, Emotion, EmotionCategory,
+                    TravelQuestionResponse, WhoCategory, StyleCategory)
+from capture_index import capture_order
+
+# 여행기 초안 생성(AI 요청)에 필요한 값을 SQL 한 문장으로 읽음
+# who/style은 스칼라 서브쿼리, 이미지 목록은 json_agg로 묶어 여행기당 한 행만 반환
+# (이미지/메타데이터, 사전 질문 응답, 감정, who, style을 따로 읽던 7번의 왕복을 대체)
+# 캡션은 바로 앞 단계(2차 선별)에서 저장되므로 미리 계산해 두는 뷰 대신 요청마다 조회
+
+
+def generation_context_query(travelogue_id: int):
+    # 이미지 별 how (가장 최근 응답)
+    how = select(ImageQuestionResponse.how).where(
+        ImageQuestionResponse.image_id == Image.id
+    ).order_by(ImageQuestionResponse.id.desc()).limit(1).scalar_subquery()
+    # 응답 순서, 감정 순서대로 감정 이름 목록
+    emotions = select(func.json_agg(
+        aggregate_order_by(EmotionCategory.emotion, ImageQuestionResponse.id, Emotion.id), type_=JSON
+    )).select_from(ImageQuestionResponse).join(
+        Emotion, Emotion.question_response_id == ImageQuestionResponse.id
+    ).join(
+        EmotionCategory, EmotionCategory.id == Emotion.emotion_category
+    ).where(ImageQuestionResponse.image_id == Image.id).scalar_subquery()
+    # metadata.image_id는 유니크이므로 조인해도 이미지당 한 행
+    image_object = func.json_build_object(
+        "image_id", Image.id,
+        "caption", Image.caption,
+        "created_at", Metadata.created_at,
+        "location", Metadata.location,
+        "how", how,
+        "emotion", emotions,
+    )
+    images = select(func.json_agg(aggregate_order_by(image_object, *capture_order()), type_=JSON)).select_from(
+        TravelogueImage
+    ).join(
+        Image, and_(Image.id == TravelogueImage.image_id, Image.is_in_travelogue == True)
+    ).outerjoin(
+        Metadata, Metadata.image_id == Image.id
+    ).where(TravelogueImage.travelogue_id == Travelogue.id).scalar_subquery()
+
+    who = select(WhoCategory.who).join(
+        TravelQuestionResponse, TravelQuestionResponse.who_category == WhoCategory.id
+    ).where(
+        TravelQuestionResponse.travelogue_id == Travelogue.id
+    ).order_by(TravelQuestionResponse.id).limit(1).scalar_subquery()
+    style = select(StyleCategory.style).where(StyleCategory.id == Travelogue.style_category).scalar_subquery()
+    has_images = exists().where(TravelogueImage.travelogue_id == Travelogue.id)
+
+    return select(
+        who.label("who"), style.label("style"), has_images.label("has_images"), images.label("images")
+    ).select_from(Travelogue).where(Travelogue.id == travelogue_id)
+
+
+# {"who", "style", "images": [{"image_id", "caption", "created_at", "location", "how", "emotion"}, ...]}
+# 이미지는 촬영시간순, created_at은 ISO 문자열. 여행기에 매핑된 이미지가 하나도 없으면 None
+async def load_generation_context(db: AsyncSession, travelogue_id: int) -> Optional[Dict[str, Any]]:
+    row = (await db.execute(generation_context_query(travelogue_id))).first()
+    if row is None or not row.has_images:
+        return None
+    return {
+        "who": row.who,
+        "style": row.style,
+        "images": [
+            {**image, "emotion": image["emotion"] or []}
+            for image in row.images or []
+        ],
+    }
@@ -0,0 +1,206 @@
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import LRUCache
+from geopy.geocoders import Nominatim
+from geopy.exc import GeocoderUnavailable
+from models import GeocodeCache
+from offline_geocoder import OfflineGeocoder, haversine_m
+import asyncio
+import os
+
+NO_ADDRESS = "주소 정보 없음"
+
+# 좌표를 소수점 GEOCODE_CACHE_PRECISION 자리로 반올림한 셀 단위로 캐시 (3자리 ≈ 110m)
+GEOCODE_CACHE_PRECISION = int(os.getenv("GEOCODE_CACHE_PRECISION", 3))
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 4096))
+
+# 이 거리(m) 안의 사진은 한 장소로 묶어 한 번만 역지오코딩
+GEOCODE_CLUSTER_RADIUS_M = float(os.getenv("GEOCODE_CLUSTER_RADIUS_M", 200))
+# Nominatim 동시 요청 수와 요청 간 최소 간격 (이용 정책: 초당 1회)
+GEOCODE_CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", 2))
+NOMINATIM_MIN_INTERVAL = float(os.getenv("NOMINATIM_MIN_INTERVAL", 1.0))
+
+# 오프라인 gazetteer 인덱스 (경로가 없으면 비활성화), 반경 안에 결과가 없을 때만 Nominatim 사용
+OFFLINE_GEOCODER_PATH = os.getenv("OFFLINE_GEOCODER_PATH")
+OFFLINE_GEOCODER_RADIUS_M = float(os.getenv("OFFLINE_GEOCODER_RADIUS_M", 1000))
+
+geolocator = Nominatim(user_agent="your_app_name", timeout=600)
+
+geocode_memory_cache = LRUCache(maxsize=GEOCODE_CACHE_SIZE)
+geocode_cache_stats = {
+    "offline_hits": 0, "memory_hits": 0, "db_hits": 0, "misses": 0, "nominatim_calls": 0, "nominatim_failures": 0
+}
+offline_geocoder: Optional[OfflineGeocoder] = None
+
+
+def load_offline_geocoder() -> Optional[OfflineGeocoder]:
+    global offline_geocoder
+    if offline_geocoder is None and OFFLINE_GEOCODER_PATH:
+        offline_geocoder = OfflineGeocoder(OFFLINE_GEOCODER_PATH)
+    return offline_geocoder
+
+
+def geocode_cell_key(lat: float, lon: float, precision: int = GEOCODE_CACHE_PRECISION) -> str:
+    # -0.000 과 0.000 이 같은 셀이 되도록 0.0을 더함
+    return f"{precision}:{round(lat, precision) + 0.0:.{precision}f}:{round(lon, precision) + 0.0:.{precision}f}"
+
+
+def get_geocode_cache_metrics() -> Dict[str, Any]:
+    hits = geocode_cache_stats["offline_hits"] + geocode_cache_stats["memory_hits"] + geocode_cache_stats["db_hits"]
+    total = hits + geocode_cache_stats["misses"]
+    return {
+        **geocode_cache_stats,
+        "hit_rate": hits / total if total else 0.0,
+        "memory_size": len(geocode_memory_cache),
+        "precision": GEOCODE_CACHE_PRECISION,
+        "offline_places": offline_geocoder.count if offline_geocoder else 0,
+    }
+
+
+def nominatim_reverse(lat: float, lon: float) -> Optional[str]:
+    geocode_cache_stats["nominatim_calls"] += 1
+    try:
+        location = geolocator.reverse((lat, lon), language='ko')
+        if location and location.address:
+            return location.address
+    except GeocoderUnavailable:
+        pass
+    except Exception:
+        pass
+    geocode_cache_stats["nominatim_failures"] += 1
+    return None
+
+
+# 메모리 캐시에 없는 셀의 DB 캐시를 쿼리 한 번으로 읽어옴
+async def _load_db_cached_addresses(db: Optional[AsyncSession], keys: List[str]) -> Dict[str, str]:
+    keys = [key for key in dict.fromkeys(keys) if key not in geocode_memory_cache]
+    if db is None or not keys:
+        return {}
+    rows = await db.execute(select(GeocodeCache.cell, GeocodeCache.address).where(GeocodeCache.cell.in_(keys)))
+    return dict(rows.all())
+
+
+def _load_cached_address(key: str, db_cached: Dict[str, str]) -> Optional[str]:
+    if key in geocode_memory_cache:
+        geocode_cache_stats["memory_hits"] += 1
+        return geocode_memory_cache[key]
+    if key in db_cached:
+        geocode_cache_stats["db_hits"] += 1
+        geocode_memory_cache[key] = db_cached[key]
+        return db_cached[key]
+    return None
+
+
+async def _store_cached_addresses(db: Optional[AsyncSession], addresses: Dict[str, str]):
+    if db is None:
+        return
+    for key, address in addresses.items():
+        # 다른 요청이 같은 셀을 먼저 저장했어도 현재 트랜잭션은 유지
+        try:
+            async with db.begin_nested():
+                db.add(GeocodeCache(cell=key, address=address))
+        except IntegrityError:
+            pass
+
+
+class AsyncRateLimiter:
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+
+    # 호출 순서대로 min_interval 간격의 시작 슬롯을 예약
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+nominatim_semaphore = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+nominatim_rate_limiter = AsyncRateLimiter(NOMINATIM_MIN_INTERVAL)
+_inflight_lookups: Dict[str, asyncio.Future] = {}
+
+
+async def _nominatim_reverse_limited(lat: float, lon: float) -> Optional[str]:
+    async with nominatim_semaphore:
+        await nominatim_rate_limiter.wait()
+        # geopy 호출은 블로킹이므로 스레드에서 실행
+        return await asyncio.to_thread(nominatim_reverse, lat, lon)
+
+
+# 오프라인 인덱스 -> 메모리 LRU -> DB 캐시 -> Nominatim 순으로 조회하며, 실패 결과는 캐시하지 않음
+# 같은 셀에 대한 동시 조회는 진행 중인 요청 하나를 공유
+# (주소, Nominatim에서 새로 받아 DB에 저장해야 하는 셀 키 또는 None)을 반환
+async def _reverse_geocode(lat: float, lon: float, db_cached: Dict[str, str]) -> Tuple[str, Optional[str]]:
+    geocoder = load_offline_geocoder()
+    if geocoder is not None:
+        found = geocoder.nearest(lat, lon, OFFLINE_GEOCODER_RADIUS_M)
+        if found is not None:
+            geocode_cache_stats["offline_hits"] += 1
+            return found[0], None
+
+    key = geocode_cell_key(lat, lon)
+    cached = _load_cached_address(key, db_cached)
+    if cached is not None:
+        return cached, None
+    if key in _inflight_lookups:
+        geocode_cache_stats["memory_hits"] += 1
+        address = await asyncio.shield(_inflight_lookups[key])
+        return (address if address is not None else NO_ADDRESS), None
+
+    geocode_cache_stats["misses"] += 1
+    future = asyncio.get_running_loop().create_future()
+    _inflight_lookups[key] = future
+    try:
+        address = await _nominatim_reverse_limited(lat, lon)
+        future.set_result(address)
+    except BaseException as e:
+        future.set_result(None)
+        raise e
+    finally:
+        _inflight_lookups.pop(key, None)
+    if address is None:
+        return NO_ADDRESS, None
+    geocode_memory_cache[key] = address
+    return address, key
+
+
+# 거리 임계값 기반 leader 클러스터링: 중심점에서 radius_m 안이면 같은 클러스터
+def cluster_points(points: Dict[int, Tuple[float, float]], radius_m: float = GEOCODE_CLUSTER_RADIUS_M) -> List[List[int]]:
+    clusters = []  # [lat 합, lon 합, 멤버 id 목록]
+    for point_id, (lat, lon) in sorted(points.items(), key=lambda item: item[1]):
+        for cluster in clusters:
+            count = len(cluster[2])
+            if haversine_m(cluster[0] / count, cluster[1] / count, lat, lon) <= radius_m:
+                cluster[0] += lat
+                cluster[1] += lon
+                cluster[2].append(point_id)
+                break
+        else:
+            clusters.append([lat, lon, [point_id]])
+    return [cluster[2] for cluster in clusters]
+
+
+def cluster_representative(points: Dict[int, Tuple[float, float]], members: List[int]) -> Tuple[float, float]:
+    # 중심에 가장 가까운 실제 촬영 좌표를 대표점으로 사용
+    center_lat = sum(points[m][0] for m in members) / len(members)
+    center_lon = sum(points[m][1] for m in members) / len(members)
+    return min(
+        (points[m] for m in members),
+        key=lambda p: haversine_m(center_lat, center_lon, p[0], p[1])
+    )
+
+
+# 좌표를 클러스터로 묶고 클러스터당 한 번만 역지오코딩해 모든 멤버에 결과 적용
+# AsyncSession은 동시에 쿼리를 실행할 수 없으므로 DB 캐시는 조회 전에 한 번에 읽고, 새 주소는 끝난 뒤 차례로 저장
+async def reverse_geocode_points(points: Dict[int, Tuple[float, float]], db: Optional[AsyncSession] = None) -> Dict[int, str]:
+    clusters = cluster_points(points)
+    representatives = [cluster_representative(points, members) for members in clusters]
+
+    db_cached = await _load_db_cached_addresses(db, [geocode_cell_key(lat, lon) for lat, lon in representatives])
+    results = await asyncio.gather(*(_reverse_geocode(lat, lon, db_cached) for lat, lon in representatives))
+    await _store_cached_addresses(db, {key: address for address, key in results if key is not None})
+    return {point_id: address for members, (address, _) in zip(clusters, results) for point_id in members}
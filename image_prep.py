@@ -0,0 +1,182 @@
+from typing import Optional, Tuple, Dict, NamedTuple, Union
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image as PILImage, ExifTags
+import io
+import multiprocessing
+import os
+
+# process: 코어 수만큼 병렬 (GIL 영향 없음), thread: 단일 프로세스 환경/디버깅용
+IMAGE_PREP_EXECUTOR = os.getenv("IMAGE_PREP_EXECUTOR", "process")
+IMAGE_PREP_WORKERS = int(os.getenv("IMAGE_PREP_WORKERS", os.cpu_count() or 1))
+# jpeg: JPEG 바이트를 PDF에 DCT 스트림으로 그대로 넣음, flate: 디코딩한 픽셀을 Flate로 압축 (기존 방식)
+PDF_IMAGE_MODE = os.getenv("PDF_IMAGE_MODE", "jpeg")
+
+ORIENTATION_TAG = next(tag for tag, name in ExifTags.TAGS.items() if name == "Orientation")
+ORIENTATION_TRANSPOSE = {
+    3: PILImage.Transpose.ROTATE_180,
+    6: PILImage.Transpose.ROTATE_270,
+    8: PILImage.Transpose.ROTATE_90,
+}
+
+
+def rotate_by_orientation(pil_img, orientation_value):
+    transpose = ORIENTATION_TRANSPOSE.get(orientation_value)
+    return pil_img.transpose(transpose) if transpose is not None else pil_img
+
+
+def read_orientation(pil_img) -> Optional[int]:
+    try:
+        return pil_img.getexif().get(ORIENTATION_TAG)
+    except Exception:
+        return None
+
+
+def correct_image_orientation(pil_img, orientation_value=None):
+    # 업로드 시점에 저장된 orientation이 있으면 EXIF를 다시 읽지 않음
+    if orientation_value is None:
+        orientation_value = read_orientation(pil_img)
+    return rotate_by_orientation(pil_img, orientation_value)
+
+
+def pdf_target_pixels(max_width_pt, max_height_pt, dpi=150, scale=1.1) -> Tuple[int, int]:
+    return int(max_width_pt * dpi / 72 * scale), int(max_height_pt * dpi / 72 * scale)
+
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    ratio = min(max_width / width, max_height / height, 1.0)
+    return int(width * ratio), int(height * ratio)
+
+
+def resize_for_pdf(pil_img, max_width_pt, max_height_pt, dpi=150, scale=1.1):
+    new_size = fit_size(*pil_img.size, *pdf_target_pixels(max_width_pt, max_height_pt, dpi, scale))
+    return pil_img.resize(new_size, PILImage.LANCZOS)
+
+
+# 원본을 PDF에 필요한 크기에 가깝게만 디코딩한 뒤 회전/리사이즈
+# JPEG은 draft 모드로 DCT 단계에서 1/2, 1/4, 1/8로 줄여 디코딩하므로 전체 해상도 디코딩을 피함
+# 프로세스 풀에서 실행되므로 모듈 수준 함수이고 이미지 바이트 또는 파일 경로만 받음
+def prepare_for_pdf(image_source: Union[bytes, str], orientation: Optional[int], max_width_px: int, max_height_px: int):
+    # 경로로 연 파일은 디코딩(load) 후 PIL이 닫음
+    pil_img = PILImage.open(io.BytesIO(image_source) if isinstance(image_source, bytes) else image_source)
+    if orientation is None:
+        orientation = read_orientation(pil_img)
+    swap = orientation in (6, 8)
+
+    width, height = pil_img.size
+    upright = (height, width) if swap else (width, height)
+    target_w, target_h = fit_size(*upright, max_width_px, max_height_px)
+
+    if pil_img.format == "JPEG":
+        # draft는 요청 크기 이상을 보장하는 가장 작은 배율을 선택 (회전 전 방향 기준)
+        pil_img.draft("RGB", (target_h, target_w) if swap else (target_w, target_h))
+
+    pil_img = rotate_by_orientation(pil_img, orientation)
+    pil_img = pil_img.convert("RGB")
+    if pil_img.size != (target_w, target_h):
+        pil_img = pil_img.resize((target_w, target_h), PILImage.LANCZOS)
+    return pil_img
+
+
+# PDF에 DCTDecode로 그대로 넣을 JPEG (mode는 RGB 또는 L)
+class JpegImage(NamedTuple):
+    data: bytes
+    size: Tuple[int, int]
+    mode: str
+
+
+# 이미 정방향이고 목표 크기 안에 들어가는 RGB/그레이 JPEG(print 축소본 등)은 디코딩 없이 그대로 사용
+# 헤더만 읽으므로 이벤트 루프에서 바로 호출해도 됨, 조건이 맞지 않으면 None
+def jpeg_passthrough(image_bytes: bytes, orientation: Optional[int], max_width_px: int, max_height_px: int) -> Optional[JpegImage]:
+    try:
+        pil_img = PILImage.open(io.BytesIO(image_bytes))
+    except OSError:
+        return None
+    if pil_img.format != "JPEG" or pil_img.mode not in ("RGB", "L"):
+        return None
+    if orientation is None:
+        orientation = read_orientation(pil_img)
+    if orientation not in (None, 1):
+        return None
+    if fit_size(*pil_img.size, max_width_px, max_height_px) != pil_img.size:
+        return None
+    return JpegImage(image_bytes, pil_img.size, pil_img.mode)
+
+
+# 통과시킬 수 없는 이미지는 PDF 크기로 준비한 뒤 JPEG으로 한 번만 인코딩 (프로세스 풀에서 실행)
+def prepare_jpeg_for_pdf(image_bytes: bytes, orientation: Optional[int], max_width_px: int, max_height_px: int,
+                         quality: int = 90) -> JpegImage:
+    pil_img = prepare_for_pdf(image_bytes, orientation, max_width_px, max_height_px)
+    buffer = io.BytesIO()
+    pil_img.save(buffer, "JPEG", quality=quality, optimize=True)
+    return JpegImage(buffer.getvalue(), pil_img.size, pil_img.mode)
+
+
+# 업로드 시점에 원본 옆에 저장하는 축소본: 종류 -> (최대 폭, 최대 높이, JPEG 품질)
+# 축소본은 방향 보정이 적용된(정방향) 이미지이므로 orientation을 다시 적용하지 않음
+# print는 export_travelogue 레이아웃(letter, 폭 80%, 높이 50%)에 그대로 들어가는 크기
+RENDITION_SPECS = {
+    "print": (*pdf_target_pixels(612 * 0.8, 792 * 0.5), 90),
+    "ai": (1024, 1024, 85),
+    "thumb": (320, 320, 80),
+}
+
+
+def rendition_name(name: str, kind: str) -> str:
+    # 12_1.jpg -> 12_1.thumb.jpg (gs:// URI에도 그대로 적용 가능)
+    stem = name.rsplit(".", 1)[0] if "." in name.rsplit("/", 1)[-1] else name
+    return f"{stem}.{kind}.jpg"
+
+
+# 가장 작은 적합한 축소본의 URI, 축소본이 없는 기존 이미지는 원본
+def image_uri_for(img, kind: str) -> str:
+    if kind == "original" or not img.has_renditions:
+        return img.uri
+    return rendition_name(img.uri, kind)
+
+
+# 원본은 모든 축소본을 담을 수 있는 크기로 한 번만 draft 디코딩하고, 각 축소본은 그 결과에서 줄여 인코딩
+# 업로드 시에는 원본을 메모리에 올리지 않도록 임시 파일 경로를 넘김
+def make_renditions(image_source: Union[bytes, str], orientation: Optional[int]) -> Dict[str, bytes]:
+    base = prepare_for_pdf(
+        image_source,
+        orientation,
+        max(spec[0] for spec in RENDITION_SPECS.values()),
+        max(spec[1] for spec in RENDITION_SPECS.values())
+    )
+    renditions = {}
+    for kind, (max_width, max_height, quality) in RENDITION_SPECS.items():
+        size = fit_size(*base.size, max_width, max_height)
+        pil_img = base if size == base.size else base.resize(size, PILImage.LANCZOS)
+        buffer = io.BytesIO()
+        pil_img.save(buffer, "JPEG", quality=quality, optimize=True)
+        renditions[kind] = buffer.getvalue()
+    return renditions
+
+
+def _create_executor() -> Executor:
+    if IMAGE_PREP_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=IMAGE_PREP_WORKERS)
+    if IMAGE_PREP_EXECUTOR == "process":
+        # 이벤트 루프/스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+        return ProcessPoolExecutor(
+            max_workers=IMAGE_PREP_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    raise ValueError(f"Unknown IMAGE_PREP_EXECUTOR: {IMAGE_PREP_EXECUTOR}")
+
+
+image_prep_executor: Optional[Executor] = None
+
+
+def get_image_prep_executor() -> Executor:
+    global image_prep_executor
+    if image_prep_executor is None:
+        image_prep_executor = _create_executor()
+    return image_prep_executor
+
+
+def close_image_prep_executor():
+    global image_prep_executor
+    if image_prep_executor is not None:
+        image_prep_executor.shutdown(wait=False, cancel_futures=True)
+        image_prep_executor = None
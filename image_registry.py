@@ -0,0 +1,45 @@
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Image, TravelogueImage, Metadata
+
+# 업로드된 이미지의 Image/TravelogueImage/Metadata 행을 한 번에 등록
+# 이미지마다 flush로 id를 받아오면 원격 Postgres(SSL)에 이미지 수만큼 왕복이 생기므로,
+# Image는 다중 행 INSERT ... RETURNING 한 번, 매핑/메타데이터는 각각 다중 행 INSERT 한 번으로 처리
+# (SQLAlchemy insertmanyvalues, 1000행 단위로 나뉨). commit/rollback은 호출한 쪽에서
+
+
+# entries: [{"uri", "orientation", "has_renditions", "created_at", "latitude", "longitude"}], 업로드 순서대로
+async def register_images(db: AsyncSession, travelogue_id: int, entries: List[Dict[str, Any]]) -> Tuple[List[Image], List[Dict[str, int]]]:
+    if not entries:
+        return [], []
+
+    images = (await db.scalars(
+        insert(Image).returning(Image, sort_by_parameter_order=True),
+        [
+            {
+                "travelogue_image_id": i,
+                "uri": entry["uri"],
+                "is_in_travelogue": True,
+                "orientation": entry["orientation"],
+                "has_renditions": entry["has_renditions"],
+            }
+            for i, entry in enumerate(entries, start=1)
+        ]
+    )).all()
+
+    mappings = [
+        {"travelogue_id": travelogue_id, "image_id": image.id, "captured_at": entry["created_at"]}
+        for image, entry in zip(images, entries)
+    ]
+    await db.execute(insert(TravelogueImage), mappings)
+    await db.execute(insert(Metadata), [
+        {
+            "image_id": image.id,
+            "created_at": entry["created_at"],
+            "latitude": entry["latitude"],
+            "longitude": entry["longitude"],
+        }
+        for image, entry in zip(images, entries)
+    ])
+    return images, [{"travelogue_id": m["travelogue_id"], "image_id": m["image_id"]} for m in mappings]
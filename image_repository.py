@@ -0,0 +1,38 @@
+from typing import List, Optional
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from models import Image, TravelogueImage, ImageQuestionResponse, Emotion
+from capture_index import capture_order
+
+# 여행기의 활성 이미지(is_in_travelogue)를 travelogue_image와 조인해 쿼리 한 번으로 읽음
+# 매핑을 먼저 조회해 id 목록을 만들고 Image.id.in_(...)으로 다시 조회하던 두 번의 왕복을 대체
+
+
+def active_images_query(travelogue_id: int, with_metadata: bool = False, with_questions: bool = False):
+    # 비활성 이미지도 매핑 행은 남도록 조건을 ON 절에 둠 (여행기 존재 여부 판단용)
+    query = select(TravelogueImage.image_id, Image).outerjoin(
+        Image, and_(Image.id == TravelogueImage.image_id, Image.is_in_travelogue == True)
+    ).where(
+        TravelogueImage.travelogue_id == travelogue_id
+    ).order_by(*capture_order())
+    if with_metadata:
+        # 이미지당 한 행이므로 같은 쿼리에서 조인
+        query = query.options(joinedload(Image.meta))
+    if with_questions:
+        # 이미지당 여러 행이므로 selectin으로 관계별 쿼리 한 번씩
+        query = query.options(
+            selectinload(Image.question_responses)
+            .selectinload(ImageQuestionResponse.emotions)
+            .joinedload(Emotion.category)
+        )
+    return query
+
+
+# 촬영시간순 활성 이미지 목록. 여행기에 매핑된 이미지가 하나도 없으면 None
+async def load_active_images(db: AsyncSession, travelogue_id: int, with_metadata: bool = False,
+                             with_questions: bool = False) -> Optional[List[Image]]:
+    rows = (await db.execute(active_images_query(travelogue_id, with_metadata, with_questions))).unique().all()
+    if not rows:
+        return None
+    return [image for _, image in rows if image is not None]
@@ -0,0 +1,341 @@
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+from collections import defaultdict
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from database import SessionLocal
+from models import BackgroundJob
+import asyncio
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# memory: 프로세스 내 큐 (재시작 시 유실), db: background_job 테이블 기반 큐 (여러 워커 프로세스 공유 가능)
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+# 완료된 작업 결과 보관 시간 (memory 저장소)
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+# 이 시간보다 오래 running 상태인 작업은 워커가 죽은 것으로 보고 다시 대기열에 넣음 (db 저장소)
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", 3600))
+# 시작 시뿐 아니라 이 간격마다 오래된 running 작업을 확인 (다른 프로세스가 죽은 경우)
+JOB_RECOVER_INTERVAL = float(os.getenv("JOB_RECOVER_INTERVAL", 300))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+ProgressCallback = Callable[[float, Optional[str]], Awaitable[None]]
+
+
+async def no_progress(progress: float, message: Optional[str] = None):
+    pass
+
+
+def job_concurrency(job_type: str, default: int) -> int:
+    # 예: JOB_CONCURRENCY_EXPORT=2
+    return int(os.getenv(f"JOB_CONCURRENCY_{job_type.upper()}", default))
+
+
+class Job:
+    def __init__(self, job_type: str, params: Dict[str, Any], id: Optional[str] = None,
+                 status: str = JOB_QUEUED, progress: float = 0.0, message: Optional[str] = None,
+                 result: Any = None, error: Optional[str] = None, created_at: Optional[datetime] = None,
+                 started_at: Optional[datetime] = None, finished_at: Optional[datetime] = None):
+        self.id = id or uuid.uuid4().hex
+        self.job_type = job_type
+        self.params = params
+        self.status = status
+        self.progress = progress
+        self.message = message
+        self.result = result
+        self.error = error
+        self.created_at = created_at or datetime.utcnow()
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class MemoryJobStore:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self.queues: Dict[str, asyncio.Queue] = defaultdict(asyncio.Queue)
+
+    def _prune(self):
+        expire_before = datetime.utcnow() - timedelta(seconds=JOB_RESULT_TTL)
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.done and job.finished_at < expire_before]:
+            del self.jobs[job_id]
+
+    async def add(self, job: Job):
+        self._prune()
+        self.jobs[job.id] = job
+        self.queues[job.job_type].put_nowait(job.id)
+
+    async def claim(self, job_type: str) -> Job:
+        while True:
+            job = self.jobs.get(await self.queues[job_type].get())
+            if job is not None and job.status == JOB_QUEUED:
+                job.status = JOB_RUNNING
+                job.started_at = datetime.utcnow()
+                return job
+
+    async def save(self, job: Job):
+        pass
+
+    async def requeue(self, job: Job):
+        self.queues[job.job_type].put_nowait(job.id)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def recover(self):
+        pass
+
+
+# 작업 상태를 DB에 저장하는 내구성 있는 큐
+# 여러 프로세스가 같은 테이블을 폴링하며 FOR UPDATE SKIP LOCKED로 작업을 하나씩 가져감
+class DatabaseJobStore:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._wakeups: Dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+
+    @staticmethod
+    def _to_job(row: BackgroundJob) -> Job:
+        return Job(
+            row.job_type, row.params, id=row.id, status=row.status, progress=row.progress,
+            message=row.message, result=row.result, error=row.error, created_at=row.created_at,
+            started_at=row.started_at, finished_at=row.finished_at
+        )
+
+    async def add(self, job: Job):
+        async with self.session_factory() as db:
+            db.add(BackgroundJob(
+                id=job.id, job_type=job.job_type, params=job.params, status=job.status,
+                progress=job.progress, created_at=job.created_at
+            ))
+            await db.commit()
+        self._wakeups[job.job_type].set()
+
+    async def _claim_one(self, job_type: str) -> Optional[Job]:
+        async with self.session_factory() as db:
+            while True:
+                row = (await db.scalars(select(BackgroundJob).where(
+                    BackgroundJob.job_type == job_type,
+                    BackgroundJob.status == JOB_QUEUED
+                ).order_by(BackgroundJob.created_at).limit(1).with_for_update(skip_locked=True))).first()
+                if row is None:
+                    return None
+                # 행 잠금을 지원하지 않는 DB에서도 한 워커만 가져가도록 상태 조건부로 갱신
+                started_at = datetime.utcnow()
+                claimed = (await db.execute(update(BackgroundJob).where(
+                    BackgroundJob.id == row.id,
+                    BackgroundJob.status == JOB_QUEUED
+                ).values(status=JOB_RUNNING, started_at=started_at))).rowcount
+                await db.commit()
+                if claimed:
+                    job = self._to_job(row)
+                    job.status = JOB_RUNNING
+                    job.started_at = started_at
+                    return job
+
+    async def claim(self, job_type: str) -> Job:
+        wakeup = self._wakeups[job_type]
+        while True:
+            wakeup.clear()
+            job = await self._claim_one(job_type)
+            if job is not None:
+                return job
+            # 같은 프로세스에서 넣은 작업은 즉시, 다른 프로세스에서 넣은 작업은 폴링으로 감지
+            try:
+                await asyncio.wait_for(wakeup.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def save(self, job: Job):
+        async with self.session_factory() as db:
+            await db.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(
+                status=job.status, progress=job.progress, message=job.message, result=job.result,
+                error=job.error, finished_at=job.finished_at
+            ))
+            await db.commit()
+
+    async def requeue(self, job: Job):
+        async with self.session_factory() as db:
+            await db.execute(update(BackgroundJob).where(
+                BackgroundJob.id == job.id,
+                BackgroundJob.status == JOB_RUNNING
+            ).values(status=JOB_QUEUED, progress=job.progress, message=job.message, started_at=None))
+            await db.commit()
+        self._wakeups[job.job_type].set()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        async with self.session_factory() as db:
+            row = await db.get(BackgroundJob, job_id)
+            return self._to_job(row) if row else None
+
+    async def recover(self):
+        async with self.session_factory() as db:
+            stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_AFTER)
+            count = (await db.execute(update(BackgroundJob).where(
+                BackgroundJob.status == JOB_RUNNING,
+                BackgroundJob.started_at < stale_before
+            ).values(status=JOB_QUEUED, started_at=None))).rowcount
+            await db.commit()
+        if count:
+            logger.warning("%s stale background jobs requeued", count)
+
+
+def create_job_store(kind: str):
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "db":
+        return DatabaseJobStore()
+    raise ValueError(f"Unknown JOB_STORE: {kind}")
+
+
+# 작업 종류별로 핸들러와 워커 수를 등록하고, 종류별 워커가 저장소에서 작업을 꺼내 실행
+# 핸들러는 (db, progress, **params)를 받아 JSON으로 변환 가능한 결과를 반환
+class JobEngine:
+    def __init__(self, store):
+        self.store = store
+        self.session_factory = SessionLocal
+        self.handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self.concurrency: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"submitted": 0, "running": 0, "succeeded": 0, "failed": 0, "requeued": 0}
+        )
+        self._workers: List[asyncio.Task] = []
+
+    def handler(self, job_type: str, concurrency: int = 1):
+        def decorator(func):
+            self.handlers[job_type] = func
+            self.concurrency[job_type] = job_concurrency(job_type, concurrency)
+            return func
+        return decorator
+
+    async def start(self):
+        if self._workers:
+            return
+        await self.store.recover()
+        for job_type, count in self.concurrency.items():
+            for _ in range(count):
+                self._workers.append(asyncio.create_task(self._worker(job_type)))
+        self._workers.append(asyncio.create_task(self._recover_periodically()))
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job_type: str, **params) -> Job:
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = Job(job_type, jsonable_encoder(params))
+        await self.store.add(job)
+        self.stats[job_type]["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def _recover_periodically(self):
+        while True:
+            await asyncio.sleep(JOB_RECOVER_INTERVAL)
+            try:
+                await self.store.recover()
+            except Exception:
+                logger.exception("Failed to recover stale background jobs")
+
+    async def _worker(self, job_type: str):
+        while True:
+            job = await self.store.claim(job_type)
+            await self._run(job)
+
+    async def _run(self, job: Job):
+        stats = self.stats[job.job_type]
+        stats["running"] += 1
+
+        async def progress(value: float, message: Optional[str] = None):
+            job.progress = round(min(max(value, 0.0), 1.0), 4)
+            job.message = message
+            await self.store.save(job)
+
+        db = self.session_factory()
+        try:
+            try:
+                result = await self.handlers[job.job_type](db, progress, **job.params)
+                job.result = jsonable_encoder(result)
+                job.status = JOB_SUCCEEDED
+                job.progress = 1.0
+                stats["succeeded"] += 1
+            except Exception as e:
+                await db.rollback()
+                job.error = str(e.detail) if isinstance(e, HTTPException) else f"Unexpected error: {str(e)}"
+                job.status = JOB_FAILED
+                stats["failed"] += 1
+            finally:
+                await db.close()
+                stats["running"] -= 1
+        except asyncio.CancelledError:
+            # stop()/재배포로 취소된 작업은 running으로 남기지 않고 대기열로 되돌린 뒤 취소를 그대로 전달
+            job.status = JOB_QUEUED
+            job.started_at = None
+            job.progress = 0.0
+            job.message = "interrupted, requeued"
+            stats["requeued"] += 1
+            await self._save(self.store.requeue, job)
+            raise
+        job.finished_at = datetime.utcnow()
+        await self._save(self.store.save, job)
+
+    @staticmethod
+    async def _save(save, job: Job):
+        try:
+            await save(job)
+        except Exception:
+            logger.exception("Failed to save job %s", job.id)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "store": type(self.store).__name__,
+            "job_types": {
+                job_type: {"concurrency": self.concurrency[job_type], **self.stats[job_type]}
+                for job_type in self.handlers
+            },
+        }
+
+
+job_engine = JobEngine(create_job_store(JOB_STORE))
+
+
+def get_job_engine():
+    return job_engine
+
+
+async def start_job_engine():
+    await job_engine.start()
+
+
+async def stop_job_engine():
+    await job_engine.stop()
@@ -3,6 +3,21 @@ import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from api_sm import router as router_sm
 from api_sh import router as router_sh
+from api_storage import router as router_storage
+from api_jobs import router as router_jobs
+from gcs_utils import close_storage
+from geocode_utils import load_offline_geocoder
+from ai_client import close_ai_client
+from jobs import start_job_engine, stop_job_engine
+from image_prep import close_image_prep_executor
+from text_layout import load_pdf_font
+from migrations import DB_MIGRATE_ON_STARTUP, run_migrations
+from database import close_database
+import logging
+import os
+
+# 모듈 로거(logging.getLogger(__name__)) 출력 설정, uvicorn 로거는 uvicorn 설정을 따름
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 app = FastAPI()
 
@@ -16,6 +31,26 @@ app.add_middleware(
 
 app.include_router(router_sm)
 app.include_router(router_sh)
+app.include_router(router_storage)
+app.include_router(router_jobs)
+
+
+@app.on_event("startup")
+async def startup():
+    load_offline_geocoder()
+    load_pdf_font()
+    if DB_MIGRATE_ON_STARTUP:
+        await run_migrations()
+    await start_job_engine()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_job_engine()
+    await close_storage()
+    await close_ai_client()
+    close_image_prep_executor()
+    await close_database()
 
 
 if __name__ == "__main__":
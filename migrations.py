@@ -0,0 +1,263 @@
+from typing import Callable, List, NamedTuple, Set
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table, delete, func, insert, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint
+from database import engine, metadata
+from models import (Travelogue, Purpose, TravelQuestionResponse, TravelogueImage, Image, ImageQuestionResponse,
+                    Emotion, Metadata, GeocodeCache, BackgroundJob, PurposeCategory, StyleCategory, EmotionCategory,
+                    WhoCategory)
+import asyncio
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# 스키마 변경을 버전 순서대로 한 번씩 적용하고 trip_to_travel.schema_migration에 기록
+# 각 버전은 한 트랜잭션으로 적용되며, 여러 프로세스가 동시에 시작해도 Postgres advisory lock으로 한 곳에서만 실행
+# 단계마다 이미 있는 테이블/컬럼/인덱스는 건너뛰므로 수동으로 일부 반영된 DB에도 적용 가능
+# 사용법: 서버 시작 시 자동 적용 (DB_MIGRATE_ON_STARTUP=false로 끔), 또는 python migrations.py [status | dedupe-metadata]
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+MIGRATION_LOCK_ID = 7_202_405
+
+schema_migration = Table(
+    "schema_migration", MetaData(schema=metadata.schema),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# 데이터를 지워야만 진행할 수 있는 경우 등, 자동으로 적용하지 않고 운영자 확인이 필요한 상태
+class MigrationError(Exception):
+    pass
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: Table, column_name: str) -> bool:
+    return any(c["name"] == column_name for c in inspect(conn).get_columns(table.name, schema=table.schema))
+
+
+def _index_names(conn: Connection, table: Table) -> Set[str]:
+    inspector = inspect(conn)
+    names = {i["name"] for i in inspector.get_indexes(table.name, schema=table.schema)}
+    names.update(c["name"] for c in inspector.get_unique_constraints(table.name, schema=table.schema))
+    return names
+
+
+# 모델에 선언된 컬럼 정의(타입)로 ALTER TABLE ... ADD COLUMN
+def add_column(conn: Connection, table: Table, column_name: str):
+    if _has_column(conn, table, column_name):
+        return
+    preparer = conn.dialect.identifier_preparer
+    column = table.c[column_name]
+    conn.execute(text(
+        f"ALTER TABLE {preparer.format_table(table)} "
+        f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+    ))
+
+
+# 모델에 선언된 인덱스를 이름으로 찾아 생성
+def create_index(conn: Connection, table: Table, index_name: str):
+    if index_name in _index_names(conn, table):
+        return
+    next(index for index in table.indexes if index.name == index_name).create(conn)
+
+
+def create_table(conn: Connection, table: Table):
+    table.create(conn, checkfirst=True)
+
+
+# Postgres는 제약 조건으로, ALTER TABLE ADD CONSTRAINT가 없는 SQLite는 같은 이름의 유니크 인덱스로 추가
+def add_unique_constraint(conn: Connection, table: Table, constraint_name: str):
+    if constraint_name in _index_names(conn, table):
+        return
+    constraint = next(c for c in table.constraints if c.name == constraint_name)
+    if conn.dialect.name == "sqlite":
+        preparer = conn.dialect.identifier_preparer
+        columns = ", ".join(preparer.format_column(c) for c in constraint.columns)
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX {preparer.quote_schema(table.schema)}.{preparer.quote(constraint_name)} "
+            f"ON {preparer.quote(table.name)} ({columns})"
+        ))
+    else:
+        conn.execute(AddConstraint(constraint))
+
+
+def baseline(conn: Connection):
+    # 마이그레이션 도입 이전부터 있던 테이블 (새 DB에서만 생성됨)
+    for model in (Travelogue, Purpose, TravelQuestionResponse, Image, TravelogueImage, ImageQuestionResponse,
+                  Emotion, Metadata, PurposeCategory, StyleCategory, EmotionCategory, WhoCategory):
+        create_table(conn, model.__table__)
+
+
+def image_exif(conn: Connection):
+    # 업로드 시점에 EXIF에서 읽은 방향, GPS 좌표
+    add_column(conn, Image.__table__, "orientation")
+    add_column(conn, Metadata.__table__, "latitude")
+    add_column(conn, Metadata.__table__, "longitude")
+
+
+def geocode_cache(conn: Connection):
+    # 좌표 셀 단위 역지오코딩 결과 (프로세스 캐시 다음 단계)
+    create_table(conn, GeocodeCache.__table__)
+
+
+def background_job(conn: Connection):
+    # JOB_STORE=db일 때 작업 상태를 저장 (job_type, status 인덱스 포함)
+    create_table(conn, BackgroundJob.__table__)
+
+
+def image_renditions(conn: Connection):
+    # 업로드 시 thumb/ai/print 축소본을 만들었는지 여부 (이전 이미지는 NULL이므로 원본 사용)
+    add_column(conn, Image.__table__, "has_renditions")
+
+
+def capture_index(conn: Connection):
+    # 촬영시간순 정렬용 captured_at 사본과 (travelogue_id, captured_at, image_id) 인덱스
+    add_column(conn, TravelogueImage.__table__, "captured_at")
+    # 컬럼 추가 이전에 올라온 이미지의 captured_at을 메타데이터에서 채움
+    created_at = select(func.min(Metadata.created_at)).where(
+        Metadata.image_id == TravelogueImage.image_id
+    ).scalar_subquery()
+    updated = conn.execute(update(TravelogueImage).where(
+        TravelogueImage.captured_at == None,
+        created_at != None
+    ).values(captured_at=created_at)).rowcount
+    if updated:
+        logger.info("capture index backfilled: %s rows", updated)
+    # 행마다 인덱스를 갱신하지 않도록 채운 뒤에 생성
+    create_index(conn, TravelogueImage.__table__, "ix_travelogue_image_captured")
+
+
+def hot_query_indexes(conn: Connection):
+    create_index(conn, TravelogueImage.__table__, "ix_travelogue_image_image_id")
+    create_index(conn, Image.__table__, "ix_image_active")
+    create_index(conn, ImageQuestionResponse.__table__, "ix_image_question_response_image_id")
+    create_index(conn, Emotion.__table__, "ix_emotion_question_response_id")
+    create_index(conn, Purpose.__table__, "ix_purpose_travelogue_id")
+    create_index(conn, TravelQuestionResponse.__table__, "ix_travel_question_response_travelogue_id")
+    # 같은 이미지의 메타데이터가 여러 행이면 어느 행이 맞는지 알 수 없으므로 지우지 않고 실패
+    # (확인 후 직접 정리하거나 python migrations.py dedupe-metadata 실행)
+    if "uq_metadata_image_id" not in _index_names(conn, Metadata.__table__):
+        duplicates = duplicate_metadata_image_ids(conn)
+        if duplicates:
+            shown = ", ".join(str(image_id) for image_id in duplicates[:50])
+            raise MigrationError(
+                f"metadata has multiple rows for {len(duplicates)} images "
+                f"(image_id: {shown}{' ...' if len(duplicates) > 50 else ''}); "
+                "resolve them or run `python migrations.py dedupe-metadata` before upgrading"
+            )
+    add_unique_constraint(conn, Metadata.__table__, "uq_metadata_image_id")
+
+
+def duplicate_metadata_image_ids(conn: Connection) -> List[int]:
+    return list(conn.execute(
+        select(Metadata.image_id).group_by(Metadata.image_id).having(func.count() > 1).order_by(Metadata.image_id)
+    ).scalars())
+
+
+# 수동 실행 전용: 이미지별로 가장 나중에 저장된(id가 가장 큰) 메타데이터 행만 남기고, 지운 행은 로그에 남김
+def dedupe_metadata(conn: Connection) -> int:
+    if conn.in_transaction():
+        conn.commit()
+    with conn.begin():
+        latest_ids = select(func.max(Metadata.id)).group_by(Metadata.image_id)
+        removed = conn.execute(select(
+            Metadata.id, Metadata.image_id, Metadata.created_at, Metadata.location
+        ).where(Metadata.id.not_in(latest_ids)).order_by(Metadata.image_id, Metadata.id)).all()
+        for row in removed:
+            logger.warning("removing duplicate metadata id=%s image_id=%s created_at=%s location=%s",
+                           row.id, row.image_id, row.created_at, row.location)
+        if removed:
+            conn.execute(delete(Metadata).where(Metadata.id.in_([row.id for row in removed])))
+    return len(removed)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", baseline),
+    Migration(2, "image_exif", image_exif),
+    Migration(3, "geocode_cache", geocode_cache),
+    Migration(4, "background_job", background_job),
+    Migration(5, "image_renditions", image_renditions),
+    Migration(6, "capture_index", capture_index),
+    Migration(7, "hot_query_indexes", hot_query_indexes),
+]
+
+
+def _lock(conn: Connection):
+    # 트랜잭션이 끝나면 자동으로 풀림
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+def applied_versions(conn: Connection) -> Set[int]:
+    if not inspect(conn).has_table(schema_migration.name, schema=schema_migration.schema):
+        return set()
+    return set(conn.execute(select(schema_migration.c.version)).scalars())
+
+
+# 동기 Connection에서 실행 (비동기 엔진에서는 AsyncConnection.run_sync로 호출)
+def upgrade(conn: Connection) -> List[int]:
+    if conn.in_transaction():
+        conn.commit()
+    with conn.begin():
+        _lock(conn)
+        schema_migration.create(conn, checkfirst=True)
+
+    applied = []
+    for migration in MIGRATIONS:
+        with conn.begin():
+            _lock(conn)
+            # 잠금을 얻는 사이 다른 프로세스가 적용했을 수 있으므로 다시 확인
+            if migration.version in applied_versions(conn):
+                continue
+            migration.upgrade(conn)
+            conn.execute(insert(schema_migration).values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+            ))
+        logger.info("migration %04d_%s applied", migration.version, migration.name)
+        applied.append(migration.version)
+    return applied
+
+
+async def run_migrations() -> List[int]:
+    async with engine.connect() as conn:
+        return await conn.run_sync(upgrade)
+
+
+async def migration_status() -> List[str]:
+    async with engine.connect() as conn:
+        applied = await conn.run_sync(applied_versions)
+    return [
+        f"{migration.version:04d}_{migration.name}: {'applied' if migration.version in applied else 'pending'}"
+        for migration in MIGRATIONS
+    ]
+
+
+async def _main(command: str):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        if command == "status":
+            print("\n".join(await migration_status()))
+        elif command == "upgrade":
+            applied = await run_migrations()
+            print(f"{len(applied)} migrations applied")
+        elif command == "dedupe-metadata":
+            async with engine.connect() as conn:
+                removed = await conn.run_sync(dedupe_metadata)
+            print(f"{removed} duplicate metadata rows removed")
+        else:
+            raise SystemExit(f"Unknown command: {command} (upgrade | status | dedupe-metadata)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
@@ -1,12 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, JSON, Index, UniqueConstraint, func
+from sqlalchemy.orm import relationship
 from database import Base
 
+# 관계는 모두 lazy="raise": 비동기 세션에서는 지연 로딩을 할 수 없으므로
+# 필요한 관계는 쿼리에서 명시적으로 함께 로드 (image_repository 참고)
+
 class Travelogue(Base):
     __tablename__ = 'travelogue'
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     style_category = Column(Integer)
     created_at = Column(DateTime, server_default=func.now())
 
+    image_links = relationship("TravelogueImage", back_populates="travelogue", lazy="raise")
+    images = relationship("Image", secondary=lambda: TravelogueImage.__table__, viewonly=True, lazy="raise")
+
 
 class Purpose(Base):
     __tablename__ = 'purpose'
@@ -14,6 +21,10 @@ class Purpose(Base):
     travelogue_id = Column(Integer, ForeignKey('travelogue.id'), nullable=False)
     purpose_category = Column(Integer)
 
+    __table_args__ = (
+        Index('ix_purpose_travelogue_id', 'travelogue_id'),
+    )
+
 
 class TravelQuestionResponse(Base):
     __tablename__ = 'travel_question_response'
@@ -21,11 +32,26 @@ class TravelQuestionResponse(Base):
     travelogue_id = Column(Integer, ForeignKey('travelogue.id'), nullable=False)
     who_category = Column(Integer)
 
+    __table_args__ = (
+        Index('ix_travel_question_response_travelogue_id', 'travelogue_id'),
+    )
+
 
 class TravelogueImage(Base):
     __tablename__ = 'travelogue_image'
     travelogue_id = Column(Integer, ForeignKey('travelogue.id'), primary_key=True, nullable=False)
     image_id = Column(Integer, ForeignKey('image.id'), primary_key=True, nullable=False)
+    # Metadata.created_at(촬영시간)의 사본. 여행기 안의 시간순 정렬을 인덱스 하나로 처리 (capture_index 참고)
+    captured_at = Column(DateTime)
+
+    # travelogue_id 단독 조회는 기본 키 (travelogue_id, image_id)의 앞 컬럼으로 처리
+    __table_args__ = (
+        Index('ix_travelogue_image_captured', 'travelogue_id', 'captured_at', 'image_id'),
+        Index('ix_travelogue_image_image_id', 'image_id'),
+    )
+
+    travelogue = relationship("Travelogue", back_populates="image_links", lazy="raise")
+    image = relationship("Image", back_populates="travelogue_links", lazy="raise")
 
 
 class Image(Base):
@@ -38,6 +64,22 @@ class Image(Base):
     draft = Column(String)
     final = Column(String)
     is_in_travelogue = Column(Boolean)
+    orientation = Column(Integer)
+    # 업로드 시 축소본(thumb/ai/print)을 함께 저장했는지 여부 (image_prep.RENDITION_SPECS)
+    has_renditions = Column(Boolean, default=False)
+
+    # 활성 이미지만 담는 부분 인덱스 (Image.id.in_(...) + is_in_travelogue 조회)
+    __table_args__ = (
+        Index('ix_image_active', 'id',
+              postgresql_where=is_in_travelogue == True, sqlite_where=is_in_travelogue == True),
+    )
+
+    travelogue_links = relationship("TravelogueImage", back_populates="image", lazy="raise")
+    # 이미지당 메타데이터 한 행 (Base.metadata와 이름이 겹치지 않도록 meta)
+    meta = relationship("Metadata", back_populates="image", uselist=False, lazy="raise")
+    question_responses = relationship(
+        "ImageQuestionResponse", back_populates="image", order_by="ImageQuestionResponse.id", lazy="raise"
+    )
 
 
 class ImageQuestionResponse(Base):
@@ -46,6 +88,13 @@ class ImageQuestionResponse(Base):
     image_id = Column(Integer, ForeignKey('image.id'), nullable=False)
     how = Column(String)
 
+    __table_args__ = (
+        Index('ix_image_question_response_image_id', 'image_id'),
+    )
+
+    image = relationship("Image", back_populates="question_responses", lazy="raise")
+    emotions = relationship("Emotion", back_populates="question_response", lazy="raise")
+
 
 class Emotion(Base):
     __tablename__ = 'emotion'
@@ -53,6 +102,16 @@ class Emotion(Base):
     question_response_id = Column(Integer, ForeignKey('image_question_response.id'), nullable=False)
     emotion_category = Column(Integer)
 
+    __table_args__ = (
+        Index('ix_emotion_question_response_id', 'question_response_id'),
+    )
+
+    question_response = relationship("ImageQuestionResponse", back_populates="emotions", lazy="raise")
+    category = relationship(
+        "EmotionCategory", primaryjoin="Emotion.emotion_category == EmotionCategory.id",
+        foreign_keys=[emotion_category], viewonly=True, lazy="raise"
+    )
+
 
 class Metadata(Base):
     __tablename__ = 'metadata'
@@ -60,6 +119,37 @@ class Metadata(Base):
     image_id = Column(Integer, ForeignKey('image.id'), nullable=False)
     created_at = Column(DateTime)
     location = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+
+    # 이미지당 한 행 (image_id 조회 인덱스 겸용, ON CONFLICT (image_id) upsert 가능)
+    __table_args__ = (
+        UniqueConstraint('image_id', name='uq_metadata_image_id'),
+    )
+
+    image = relationship("Image", back_populates="meta", lazy="raise")
+
+
+class GeocodeCache(Base):
+    __tablename__ = 'geocode_cache'
+    cell = Column(String, primary_key=True, nullable=False)
+    address = Column(String, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class BackgroundJob(Base):
+    __tablename__ = 'background_job'
+    id = Column(String, primary_key=True, nullable=False)
+    job_type = Column(String, nullable=False, index=True)
+    params = Column(JSON)
+    status = Column(String, nullable=False, index=True)
+    progress = Column(Float, nullable=False, default=0.0)
+    message = Column(String)
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
 
 
 class PurposeCategory(Base):
@@ -0,0 +1,125 @@
+from typing import Optional, List, Tuple
+from array import array
+import argparse
+import csv
+import math
+import mmap
+import struct
+
+# 파일 구조 (리틀엔디언, 네이티브 정렬):
+#   헤더 16바이트: magic(4) version(u32) count(u32) reserved(u32)
+#   좌표: count * 2 float64 (lat, lon) - 암시적 KD-tree 순서로 저장
+#   이름 오프셋: (count + 1) * uint32
+#   이름: UTF-8 바이트
+GAZETTEER_MAGIC = b"TTGZ"
+GAZETTEER_VERSION = 1
+HEADER_FORMAT = "<4sIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+METERS_PER_DEGREE = 111320.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+# 중앙값이 구간 가운데 오도록 재귀적으로 정렬하면 트리 노드 없이 배열 자체가 KD-tree가 됨
+def _kd_order(records: List[Tuple[float, float, str]], lo: int, hi: int, axis: int):
+    if hi - lo <= 1:
+        return
+    records[lo:hi] = sorted(records[lo:hi], key=lambda r: r[axis])
+    mid = (lo + hi) // 2
+    _kd_order(records, lo, mid, 1 - axis)
+    _kd_order(records, mid + 1, hi, 1 - axis)
+
+
+def build_gazetteer(records: List[Tuple[float, float, str]], output_path: str) -> int:
+    records = list(records)
+    _kd_order(records, 0, len(records), 0)
+
+    coords = array("d")
+    offsets = array("I", [0])
+    names = bytearray()
+    for lat, lon, name in records:
+        coords.extend((lat, lon))
+        names += name.encode("utf-8")
+        offsets.append(len(names))
+
+    with open(output_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, GAZETTEER_MAGIC, GAZETTEER_VERSION, len(records), 0))
+        f.write(coords.tobytes())
+        f.write(offsets.tobytes())
+        f.write(names)
+    return len(records)
+
+
+# mmap 위에서 바로 조회하므로 워커 프로세스들이 페이지 캐시를 공유하고 별도 복사본이 없음
+class OfflineGeocoder:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, _ = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != GAZETTEER_MAGIC or version != GAZETTEER_VERSION:
+            raise ValueError(f"Invalid gazetteer file: {path}")
+        self.count = count
+        view = memoryview(self._mmap)
+        coords_end = HEADER_SIZE + count * 16
+        offsets_end = coords_end + (count + 1) * 4
+        self._coords = view[HEADER_SIZE:coords_end].cast("d")
+        self._offsets = view[coords_end:offsets_end].cast("I")
+        self._names = view[offsets_end:]
+
+    def name(self, index: int) -> str:
+        return bytes(self._names[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+    def nearest(self, lat: float, lon: float, radius_m: float) -> Optional[Tuple[str, float]]:
+        coords = self._coords
+        best_index, best_distance = -1, radius_m
+        # 경도 방향 평면 거리 하한은 반경 내 최대 위도의 cos으로 계산
+        cos_lat = math.cos(math.radians(min(89.9, abs(lat) + radius_m / METERS_PER_DEGREE)))
+        stack = [(0, self.count, 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            p_lat, p_lon = coords[2 * mid], coords[2 * mid + 1]
+            distance = haversine_m(lat, lon, p_lat, p_lon)
+            if distance <= best_distance:
+                best_index, best_distance = mid, distance
+            if axis == 0:
+                diff = lat - p_lat
+                plane_distance = abs(diff) * METERS_PER_DEGREE
+            else:
+                diff = lon - p_lon
+                plane_distance = abs(diff) * METERS_PER_DEGREE * cos_lat
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            if plane_distance <= best_distance:
+                stack.append((far[0], far[1], 1 - axis))
+            stack.append((near[0], near[1], 1 - axis))
+        if best_index < 0:
+            return None
+        return self.name(best_index), best_distance
+
+
+def read_gazetteer_csv(path: str) -> List[Tuple[float, float, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            (float(row["latitude"]), float(row["longitude"]), row["name"])
+            for row in csv.DictReader(f)
+            if row.get("name")
+        ]
+
+
+if __name__ == "__main__":
+    # 사용법: python offline_geocoder.py places_ko.csv gazetteer.bin
+    # CSV 헤더: latitude,longitude,name (name은 한국어 주소/지명)
+    parser = argparse.ArgumentParser(description="오프라인 역지오코딩용 gazetteer 인덱스 생성")
+    parser.add_argument("csv_path")
+    parser.add_argument("output_path")
+    args = parser.parse_args()
+    count = build_gazetteer(read_gazetteer_csv(args.csv_path), args.output_path)
+    print(f"{count} places written to {args.output_path}")
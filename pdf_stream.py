@@ -0,0 +1,202 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from reportlab.pdfbase.ttfonts import TTFont, SUBSETN, makeToUnicodeCMap, FF_SYMBOLIC, FF_NONSYMBOLIC
+from image_prep import JpegImage
+import zlib
+
+PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+
+
+def _format_number(value: float) -> str:
+    text = f"{value:.3f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+# 페이지를 만드는 즉시 sink로 내보내는 PDF 작성기
+# ReportLab canvas는 save() 전까지 모든 페이지와 이미지를 메모리에 들고 있으므로,
+# 페이지 수와 무관하게 메모리를 일정하게 유지하기 위해 객체를 바로 기록하고 오프셋만 보관함
+# TTF 서브셋/ToUnicode 생성은 ReportLab의 TTFont를 그대로 사용하고, 폰트 객체는 마지막에 기록
+class StreamingPDFWriter:
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, sink: Callable[[bytes], None], font: TTFont, page_size: Tuple[float, float]):
+        self._sink = sink
+        self.font = font
+        self.page_width, self.page_height = page_size
+        self.position = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_id = self.PAGES_ID + 1
+        self._page_ids: List[int] = []
+        self._subset_ids: Dict[int, int] = {}
+        self._image_count = 0
+        self._closed = False
+        self._write(PDF_HEADER)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _write(self, data: bytes):
+        self._sink(data)
+        self.position += len(data)
+
+    def _allocate(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id: int, body: bytes):
+        self._offsets[obj_id] = self.position
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def _write_stream(self, obj_id: int, entries: str, data: bytes, compress: bool = True):
+        if compress:
+            data = zlib.compress(data)
+            entries += " /Filter /FlateDecode"
+        self._write_object(
+            obj_id,
+            f"<< {entries} /Length {len(data)} >>\nstream\n".encode("latin-1") + data + b"\nendstream"
+        )
+
+    def _subset_ref(self, subset: int) -> str:
+        if subset not in self._subset_ids:
+            self._subset_ids[subset] = self._allocate()
+        return f"F1S{subset}"
+
+    def _encode_text(self, text: str, font_size: float, fonts_used: Dict[str, int]) -> str:
+        operations = []
+        for subset, chunk in self.font.splitString(text, self):
+            name = self._subset_ref(subset)
+            fonts_used[name] = self._subset_ids[subset]
+            operations.append(f"/{name} {_format_number(font_size)} Tf <{chunk.hex()}> Tj")
+        return " ".join(operations)
+
+    def _write_jpeg(self, jpeg: JpegImage) -> int:
+        # JPEG 바이트를 재압축 없이 DCTDecode 스트림으로 기록
+        color_space = "/DeviceRGB" if jpeg.mode == "RGB" else "/DeviceGray"
+        obj_id = self._allocate()
+        width, height = jpeg.size
+        self._write_stream(
+            obj_id,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode",
+            jpeg.data,
+            compress=False
+        )
+        return obj_id
+
+    def _write_image(self, pil_img) -> int:
+        if isinstance(pil_img, JpegImage):
+            return self._write_jpeg(pil_img)
+        if pil_img.mode not in ("RGB", "L"):
+            pil_img = pil_img.convert("RGB")
+        color_space = "/DeviceRGB" if pil_img.mode == "RGB" else "/DeviceGray"
+        obj_id = self._allocate()
+        width, height = pil_img.size
+        self._write_stream(
+            obj_id,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {color_space} /BitsPerComponent 8",
+            pil_img.tobytes()
+        )
+        return obj_id
+
+    # pil_img: PIL 이미지 또는 JpegImage, image_box: (x, y, width, height), lines: [(x, y, text)] - 좌표는 pt, 원점은 왼쪽 아래
+    def add_page(self, pil_img=None, image_box: Optional[Tuple[float, float, float, float]] = None,
+                 lines: Optional[List[Tuple[float, float, str]]] = None, font_size: float = 12):
+        content = []
+        xobjects = {}
+        fonts_used: Dict[str, int] = {}
+
+        if pil_img is not None:
+            self._image_count += 1
+            name = f"Im{self._image_count}"
+            xobjects[name] = self._write_image(pil_img)
+            x, y, width, height = (_format_number(v) for v in image_box)
+            content.append(f"q {width} 0 0 {height} {x} {y} cm /{name} Do Q")
+
+        for x, y, text in lines or []:
+            if not text:
+                continue
+            content.append(
+                f"BT {_format_number(x)} {_format_number(y)} Td "
+                f"{self._encode_text(text, font_size, fonts_used)} ET"
+            )
+
+        content_id = self._allocate()
+        self._write_stream(content_id, "", "\n".join(content).encode("latin-1"))
+
+        resources = ["/ProcSet [/PDF /Text /ImageB /ImageC /ImageI]"]
+        if fonts_used:
+            resources.append("/Font << " + " ".join(
+                f"/{name} {obj_id} 0 R" for name, obj_id in sorted(fonts_used.items())
+            ) + " >>")
+        if xobjects:
+            resources.append("/XObject << " + " ".join(
+                f"/{name} {obj_id} 0 R" for name, obj_id in xobjects.items()
+            ) + " >>")
+
+        page_id = self._allocate()
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+            f"/MediaBox [0 0 {_format_number(self.page_width)} {_format_number(self.page_height)}] "
+            f"/Resources << {' '.join(resources)} >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1"))
+        self._page_ids.append(page_id)
+
+    def _write_fonts(self):
+        state = self.font.state.get(self)
+        if state is None:
+            return
+        face = self.font.face
+        flags = (face.flags & ~FF_NONSYMBOLIC) | FF_SYMBOLIC
+        for subset_index, obj_id in sorted(self._subset_ids.items()):
+            subset = state.subsets[subset_index]
+            base_font = (SUBSETN(subset_index) + b"+" + face.name + face.subfontNameX).decode("latin-1")
+
+            font_file = face.makeSubset(subset)
+            font_file_id = self._allocate()
+            self._write_stream(font_file_id, f"/Length1 {len(font_file)}", font_file)
+
+            descriptor_id = self._allocate()
+            self._write_object(descriptor_id, (
+                f"<< /Type /FontDescriptor /FontName /{base_font} /Flags {flags} "
+                f"/FontBBox [{' '.join(str(v) for v in face.bbox)}] /ItalicAngle {face.italicAngle} "
+                f"/Ascent {face.ascent} /Descent {face.descent} /CapHeight {face.capHeight} "
+                f"/StemV {face.stemV} /MissingWidth {face.defaultWidth} /FontFile2 {font_file_id} 0 R >>"
+            ).encode("latin-1"))
+
+            cmap_id = self._allocate()
+            self._write_stream(cmap_id, "", makeToUnicodeCMap(base_font, subset).encode("latin-1"))
+
+            widths = " ".join(str(face.getCharWidth(code)) for code in subset)
+            self._write_object(obj_id, (
+                f"<< /Type /Font /Subtype /TrueType /BaseFont /{base_font} "
+                f"/FirstChar 0 /LastChar {len(subset) - 1} /Widths [{widths}] "
+                f"/FontDescriptor {descriptor_id} 0 R /ToUnicode {cmap_id} 0 R >>"
+            ).encode("latin-1"))
+        self.discard()
+
+    # 공유 TTFont에 남은 이 문서의 서브셋 상태를 정리 (close하지 못하고 중단된 경우에도 호출)
+    def discard(self):
+        self.font.state.pop(self, None)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._write_fonts()
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            self.PAGES_ID,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("latin-1")
+        )
+        self._write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode("latin-1"))
+
+        xref_offset = self.position
+        size = self._next_id
+        xref = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            xref.append(f"{self._offsets[obj_id]:010d} 00000 n \n")
+        xref.append(f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._write("".join(xref).encode("latin-1"))
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 저장소 루트의 모듈을 import (benchmarks와 같은 방식), 저장소는 프로세스 내 가짜 저장소 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+# API 모듈 import 시 엔진만 만들어지고 접속은 하지 않음 (DB가 필요한 테스트는 세션을 직접 넘김)
+for key, value in {"user": "test", "password": "test", "host": "localhost", "port": "5432", "dbname": "test"}.items():
+    os.environ.setdefault(key, value)
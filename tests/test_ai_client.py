@@ -0,0 +1,124 @@
+import asyncio
+import httpx
+import pytest
+
+from ai_client import AIClient, AICircuitOpenError, AIServerError, CircuitBreaker
+
+
+def make_client(handler, failure_threshold=3, reset_timeout=60.0) -> AIClient:
+    client = AIClient("http://ai.test")
+    client.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+    client._client = httpx.AsyncClient(base_url="http://ai.test", transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_non_retryable_5xx_opens_circuit():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, text="boom")
+
+    client = make_client(handler)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(AIServerError):
+                await client.request("/caption", {})
+        with pytest.raises(AICircuitOpenError):
+            await client.request("/caption", {})
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert client.breaker.state == "open"
+
+
+def test_4xx_counts_as_success():
+    client = make_client(lambda request: httpx.Response(422, text="bad payload"))
+    client.breaker.failures = 2
+
+    with pytest.raises(AIServerError):
+        asyncio.run(client.request("/caption", {}))
+    assert client.breaker.failures == 0
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    calls = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(request):
+            calls.append(request)
+            await release.wait()
+            return httpx.Response(200, json={"ok": True})
+
+        client = make_client(handler, failure_threshold=1, reset_timeout=0.0)
+        client.breaker.record_failure()
+        assert client.breaker.state == "half_open"
+
+        probe = asyncio.ensure_future(client.request("/caption", {}))
+        await asyncio.sleep(0)
+        # 시험 요청이 끝나기 전이므로 나머지는 기다리지 않고 바로 실패해야 함
+        others = await asyncio.wait_for(asyncio.gather(
+            *(client.request("/caption", {}) for _ in range(3)), return_exceptions=True
+        ), timeout=1)
+        assert all(isinstance(e, AICircuitOpenError) for e in others)
+
+        release.set()
+        assert await probe == {"ok": True}
+        assert client.breaker.state == "closed"
+        assert await client.request("/caption", {}) == {"ok": True}
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    async def run():
+        async def handler(request):
+            await asyncio.sleep(10)
+
+        client = make_client(handler, failure_threshold=1, reset_timeout=0.0)
+        client.breaker.record_failure()
+        probe = asyncio.ensure_future(client.request("/caption", {}))
+        await asyncio.sleep(0)
+        assert client.breaker.probing
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert not client.breaker.probing
+
+    asyncio.run(run())
+
+
+def test_read_timeout_is_not_retried(monkeypatch):
+    monkeypatch.setattr("ai_client.AI_MAX_RETRIES", 2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("generation took too long", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(AIServerError):
+        asyncio.run(client.request("/generation", {}))
+    assert len(calls) == 1
+    assert client.breaker.failures == 1
+
+
+def test_connect_error_is_retried(monkeypatch):
+    monkeypatch.setattr("ai_client.AI_MAX_RETRIES", 2)
+    monkeypatch.setattr(AIClient, "_backoff", staticmethod(lambda attempt: 0))
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = make_client(handler)
+    assert asyncio.run(client.request("/caption", {})) == {"ok": True}
+    assert len(calls) == 3
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from capture_index import set_captured_at
+from models import TravelogueImage
+
+
+def test_set_captured_at_is_one_statement(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def attach(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"ATTACH DATABASE '{tmp_path / 'schema.db'}' AS trip_to_travel")
+        cursor.close()
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            statements.append(executemany)
+
+    captured = {image_id: datetime(2024, 5, 1, 10, image_id) for image_id in range(1, 21)}
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(TravelogueImage.__table__.create)
+        async with AsyncSession(engine) as db:
+            db.add_all(TravelogueImage(travelogue_id=1, image_id=image_id) for image_id in captured)
+            await db.flush()
+            await set_captured_at(db, captured)
+            await db.commit()
+            rows = (await db.execute(select(TravelogueImage.image_id, TravelogueImage.captured_at))).all()
+        await engine.dispose()
+        return dict(rows)
+
+    assert asyncio.run(run()) == captured
+    assert statements == [True]
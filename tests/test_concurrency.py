@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+
+import gcs_utils
+from concurrency import AdaptiveLimiter
+from storage_backends import InMemoryStorage
+
+MIB = 1024 * 1024
+
+
+def record_mix(limiter: AdaptiveLimiter, samples):
+    for _ in range(50):
+        for latency, size in samples:
+            limiter._record(latency, failed=False, size=size)
+
+
+def test_mixed_sizes_do_not_shrink_limit():
+    # 30KB 썸네일 0.05초, 10MB 원본 0.8초: 같은 저장소 상태에서 나오는 정상 부하
+    limiter = AdaptiveLimiter("write", initial=5, size_unit=MIB)
+    record_mix(limiter, [(0.05, 30 * 1024), (0.05, 30 * 1024), (0.8, 10 * MIB)])
+    assert limiter.stats["decreases"] == 0
+    assert int(limiter.limit) == 5
+
+
+def test_mixed_sizes_without_size_unit_shrink_limit():
+    limiter = AdaptiveLimiter("write", initial=5)
+    record_mix(limiter, [(0.05, 30 * 1024), (0.05, 30 * 1024), (0.8, 10 * MIB)])
+    assert limiter.stats["decreases"] > 0
+
+
+def test_uniform_slowdown_still_shrinks_limit():
+    limiter = AdaptiveLimiter("write", initial=5, size_unit=MIB)
+    record_mix(limiter, [(0.05, 30 * 1024), (0.8, 10 * MIB)])
+    record_mix(limiter, [(0.2, 30 * 1024), (3.2, 10 * MIB)])
+    assert limiter.stats["decreases"] > 0
+    assert int(limiter.limit) < 5
+
+
+class SlowSource:
+    # 본문을 느리게 보내는 클라이언트 (UploadFile.read 대체)
+    def __init__(self, data: bytes, delay: float):
+        self.data = data
+        self.delay = delay
+
+    async def read(self, n: int) -> bytes:
+        await asyncio.sleep(self.delay)
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+@pytest.fixture
+def write_limiter(monkeypatch):
+    backend = InMemoryStorage("test_bucket", latency=0.01)
+    previous = gcs_utils.get_storage()
+    gcs_utils.set_storage(backend)
+    limiter = AdaptiveLimiter("write", initial=5, size_unit=MIB)
+    monkeypatch.setitem(gcs_utils.storage_limits, "write", limiter)
+    yield limiter
+    gcs_utils.set_storage(previous)
+
+
+def test_slow_client_is_not_storage_latency(write_limiter, monkeypatch):
+    monkeypatch.setattr(gcs_utils, "UPLOAD_CHUNK_SIZE", 64 * 1024)
+    data = b"x" * (256 * 1024)
+
+    async def run():
+        await gcs_utils.write_blob("fast.jpg", data)
+        # 청크마다 0.1초씩 기다리는 업로드: 저장소 호출만 재면 빠른 업로드와 같은 지연
+        return await gcs_utils.upload_stream_to_gcs(SlowSource(data, 0.1), "slow.jpg")
+
+    uri = asyncio.run(run())
+    assert uri.endswith("slow.jpg")
+    assert gcs_utils.get_storage().objects["slow.jpg"] == data
+    assert write_limiter.stats["decreases"] == 0
+    assert write_limiter.in_flight == 0
+    assert write_limiter.metrics()["latency_ms"] < 100
+
+
+def test_open_upload_streams_are_bounded(write_limiter, monkeypatch):
+    monkeypatch.setattr(gcs_utils, "UPLOAD_CHUNK_SIZE", 64 * 1024)
+    monkeypatch.setattr(gcs_utils, "upload_stream_semaphore", asyncio.Semaphore(3))
+    storage = gcs_utils.get_storage()
+    open_writer = storage.open_writer
+    open_streams, peak = 0, 0
+
+    async def counting_open_writer(*args, **kwargs):
+        nonlocal open_streams, peak
+        writer = await open_writer(*args, **kwargs)
+        open_streams += 1
+        peak = max(peak, open_streams)
+        close = writer.close
+
+        async def counting_close():
+            nonlocal open_streams
+            try:
+                return await close()
+            finally:
+                open_streams -= 1
+
+        writer.close = counting_close
+        return writer
+
+    monkeypatch.setattr(storage, "open_writer", counting_open_writer)
+    data = b"x" * (128 * 1024)
+
+    async def run():
+        # 앨범 업로드처럼 40개를 한 번에 시작
+        await asyncio.gather(*(
+            gcs_utils.upload_stream_to_gcs(SlowSource(data, 0.01), f"{i}.jpg") for i in range(40)
+        ))
+
+    asyncio.run(run())
+    assert len(storage.objects) == 40
+    assert peak == 3
@@ -0,0 +1,84 @@
+from datetime import datetime
+from PIL import Image
+import asyncio
+import io
+import os
+import pytest
+
+import gcs_utils
+from gcs_utils import EXIF_RANGE_CHUNK, read_exif_metadata_from_gcs
+from storage_backends import InMemoryStorage
+
+CREATED_AT = "2024:05:01 10:00:00"
+
+
+def make_jpeg(description_size: int = 0) -> bytes:
+    # 노이즈 이미지라 압축이 거의 안 되어 EXIF_RANGE_CHUNK보다 훨씬 큼
+    image = Image.frombytes("RGB", (600, 600), os.urandom(600 * 600 * 3))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    if description_size:
+        # 긴 ImageDescription으로 APP1(EXIF) 세그먼트를 키움
+        exif[0x010E] = "x" * description_size
+    exif.get_ifd(0x8769)[0x9003] = CREATED_AT
+    exif.get_ifd(0x8825).update({1: "N", 2: (37.0, 30.0, 0.0), 3: "E", 4: (127.0, 0.0, 0.0)})
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=95, exif=exif.tobytes())
+    return out.getvalue()
+
+
+def find_app1(data: bytes):
+    # (APP1 시작, APP1 끝)
+    pos = 2
+    while data[pos + 1] != 0xE1:
+        pos += 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+    return pos, pos + 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+
+
+@pytest.fixture
+def storage():
+    backend = InMemoryStorage("test_bucket")
+    previous = gcs_utils.get_storage()
+    gcs_utils.set_storage(backend)
+    yield backend
+    gcs_utils.set_storage(previous)
+
+
+def read_metadata(storage, name: str, data: bytes):
+    storage.objects[name] = data
+    return asyncio.run(read_exif_metadata_from_gcs(name))
+
+
+def assert_metadata(metadata):
+    assert metadata["created_at"] == datetime(2024, 5, 1, 10, 0)
+    assert metadata["latitude"] == pytest.approx(37.5)
+    assert metadata["longitude"] == pytest.approx(127.0)
+    assert metadata["orientation"] == 6
+
+
+def test_exif_at_front_reads_one_chunk(storage):
+    data = make_jpeg()
+    assert len(data) > 4 * EXIF_RANGE_CHUNK
+
+    metadata = read_metadata(storage, "front.jpg", data)
+
+    assert_metadata(metadata)
+    assert storage.stats["reads"] == 1
+    assert storage.stats["bytes_read"] <= EXIF_RANGE_CHUNK
+
+
+def test_truncated_exif_block_reads_only_missing_range(storage, monkeypatch):
+    # APP1이 첫 청크 경계에 걸치도록 청크를 APP1보다 작게 설정
+    chunk = 4096
+    monkeypatch.setattr(gcs_utils, "EXIF_RANGE_CHUNK", chunk)
+    data = make_jpeg(description_size=3 * chunk)
+    app1_start, app1_end = find_app1(data)
+    assert app1_start + 10 <= chunk < app1_end
+
+    metadata = read_metadata(storage, "truncated.jpg", data)
+
+    assert_metadata(metadata)
+    # 첫 청크 + 잘린 APP1의 나머지 [chunk, app1_end)만 읽음
+    assert storage.stats["reads"] == 2
+    assert storage.stats["bytes_read"] == app1_end
+    assert storage.stats["bytes_read"] < len(data)
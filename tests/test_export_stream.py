@@ -0,0 +1,113 @@
+import asyncio
+import io
+import os
+import tempfile
+from PIL import Image
+from reportlab.pdfbase.ttfonts import TTFont
+import pytest
+import reportlab
+
+import api_sh
+import export_cache
+import gcs_utils
+from pdf_stream import StreamingPDFWriter
+from storage_backends import InMemoryStorage, StorageError
+
+FONT = TTFont("ExportTestVera", os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf"))
+
+
+class FakeImage:
+    has_renditions = False
+    orientation = 1
+
+    def __init__(self, id: int):
+        self.id = id
+        self.uri = f"{id}.jpg"
+        self.final = f"page {id}"
+
+
+class FlakyStorage(InMemoryStorage):
+    # 지정한 객체 읽기만 저장소 오류
+    def __init__(self, failing: str):
+        super().__init__("test_bucket")
+        self.failing = failing
+
+    async def read(self, name, start=None, end=None):
+        if name == self.failing:
+            raise StorageError(f"{name}: 503")
+        return await super().read(name, start, end)
+
+
+def make_jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (64, 48), (200, 100, 50)).save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def export_env(tmp_path, monkeypatch):
+    images = [FakeImage(i) for i in range(1, 4)]
+
+    async def time_ordered_images(db, travelogue_id):
+        return [(img, None) for img in images]
+
+    async def no_cache(travelogue_id, fingerprint):
+        return None, None
+
+    monkeypatch.setattr(api_sh, "time_ordered_images", time_ordered_images)
+    monkeypatch.setattr(api_sh, "open_cached_export", no_cache)
+    monkeypatch.setattr(api_sh, "get_pdf_font", lambda: FONT)
+    monkeypatch.setattr(api_sh, "get_image_prep_executor", lambda: None)
+    monkeypatch.setattr(export_cache, "EXPORT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    def use_storage(backend):
+        for img in images:
+            backend.objects[img.uri] = make_jpeg()
+        gcs_utils.set_storage(backend)
+        return backend
+
+    previous = gcs_utils.get_storage()
+    yield use_storage
+    gcs_utils.set_storage(previous)
+    # 내려받은 이미지 임시 디렉터리가 남지 않아야 함
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("export.")]
+
+
+async def render(travelogue_id=1) -> bytes:
+    chunks, _ = await api_sh.build_travelogue_pdf(None, travelogue_id)
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_storage_error_fails_before_first_byte(export_env):
+    export_env(FlakyStorage(failing="3.jpg"))
+
+    async def run():
+        # 응답 스트림을 돌려주기 전에 실패해야 오류 응답으로 처리됨
+        with pytest.raises(StorageError):
+            await api_sh.build_travelogue_pdf(None, 1)
+
+    asyncio.run(run())
+
+
+def test_render_writes_complete_pdf(export_env):
+    storage = export_env(InMemoryStorage("test_bucket"))
+    pdf = asyncio.run(render())
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert storage.objects[export_cache.export_pdf_name(1)] == pdf
+    assert len(FONT.state) == 0
+
+
+def test_failed_render_releases_font_state(export_env, monkeypatch):
+    export_env(InMemoryStorage("test_bucket"))
+    add_page = StreamingPDFWriter.add_page
+
+    def failing_add_page(self, *args, **kwargs):
+        if self.page_count == 1:
+            raise RuntimeError("disk full")
+        return add_page(self, *args, **kwargs)
+
+    monkeypatch.setattr(StreamingPDFWriter, "add_page", failing_add_page)
+    with pytest.raises(RuntimeError):
+        asyncio.run(render())
+    assert len(FONT.state) == 0
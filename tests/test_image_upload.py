@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+
+import api_sm
+import gcs_utils
+from storage_backends import InMemoryStorage
+
+
+class UploadSource:
+    # UploadFile 대체 (read(n)과 content_type만 사용)
+    content_type = "image/jpeg"
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def read(self, n: int) -> bytes:
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+@pytest.fixture
+def storage():
+    backend = InMemoryStorage("test_bucket")
+    previous = gcs_utils.get_storage()
+    gcs_utils.set_storage(backend)
+    yield backend
+    gcs_utils.set_storage(previous)
+
+
+def test_original_is_deleted_when_exif_step_fails(storage, monkeypatch):
+    def broken_extract(path):
+        raise ValueError("broken exif")
+
+    monkeypatch.setattr(api_sm, "extract_metadata_from_file", broken_extract)
+
+    with pytest.raises(ValueError):
+        asyncio.run(api_sm.upload_image_stream(UploadSource(b"x" * 1024), "1_1.jpg"))
+    assert storage.stats["writes"] == 1
+    assert storage.stats["deletes"] == 1
+    assert "1_1.jpg" not in storage.objects
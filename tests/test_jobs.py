@@ -0,0 +1,76 @@
+import asyncio
+
+import jobs
+from jobs import JOB_QUEUED, JOB_SUCCEEDED, JobEngine, MemoryJobStore
+
+
+class FakeSession:
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def make_engine(store) -> JobEngine:
+    engine = JobEngine(store)
+    engine.session_factory = FakeSession
+    return engine
+
+
+def test_cancelled_job_is_requeued_and_runs_after_restart():
+    engine = make_engine(MemoryJobStore())
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    @engine.handler("export")
+    async def export(db, progress, travelogue_id):
+        started.set()
+        await release.wait()
+        return {"travelogue_id": travelogue_id}
+
+    async def run():
+        await engine.start()
+        job = await engine.submit("export", travelogue_id=1)
+        await asyncio.wait_for(started.wait(), 1)
+        # 재배포: 실행 중인 작업이 취소됨
+        await engine.stop()
+        interrupted = await engine.get(job.id)
+        assert interrupted.status == JOB_QUEUED
+        assert interrupted.started_at is None
+
+        release.set()
+        await engine.start()
+        for _ in range(100):
+            if (await engine.get(job.id)).done:
+                break
+            await asyncio.sleep(0.01)
+        await engine.stop()
+        return await engine.get(job.id)
+
+    job = asyncio.run(run())
+    assert job.status == JOB_SUCCEEDED
+    assert job.result == {"travelogue_id": 1}
+    assert engine.stats["export"]["requeued"] == 1
+    assert engine.stats["export"]["running"] == 0
+
+
+def test_stale_jobs_are_recovered_periodically(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_RECOVER_INTERVAL", 0.01)
+    store = MemoryJobStore()
+    calls = []
+
+    async def recover():
+        calls.append(None)
+
+    store.recover = recover
+    engine = make_engine(store)
+
+    async def run():
+        await engine.start()
+        await asyncio.sleep(0.1)
+        await engine.stop()
+
+    asyncio.run(run())
+    # 시작 시 한 번 + 주기적으로 여러 번
+    assert len(calls) > 2
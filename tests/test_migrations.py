@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import Column, MetaData, Table, UniqueConstraint, create_engine, event, inspect, text
+
+import migrations
+from database import metadata
+
+# 마이그레이션 도입 전 운영 DB의 테이블/컬럼 (인덱스/제약 없음)
+PRE_MIGRATION_COLUMNS = {
+    "travelogue": ["id", "style_category", "created_at"],
+    "purpose": ["id", "travelogue_id", "purpose_category"],
+    "travel_question_response": ["id", "travelogue_id", "who_category"],
+    "travelogue_image": ["travelogue_id", "image_id"],
+    "image": ["id", "travelogue_image_id", "uri", "importance", "caption", "draft", "final", "is_in_travelogue"],
+    "image_question_response": ["id", "image_id", "how"],
+    "emotion": ["id", "question_response_id", "emotion_category"],
+    "metadata": ["id", "image_id", "created_at", "location"],
+    "purpose_category": ["id", "purpose"],
+    "style_category": ["id", "style"],
+    "emotion_category": ["id", "emotion"],
+    "who_category": ["id", "who"],
+}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    # SQLite에서는 trip_to_travel 스키마를 별도 DB 파일로 ATTACH
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_conn, record):
+        dbapi_conn.execute(f"ATTACH DATABASE '{tmp_path / 'schema.db'}' AS trip_to_travel")
+
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+def test_duplicate_metadata_fails_instead_of_deleting(conn):
+    # 유니크 제약 이전의 metadata 테이블에 같은 이미지의 행이 둘
+    with conn.begin():
+        conn.execute(text(
+            "CREATE TABLE trip_to_travel.metadata "
+            "(id INTEGER PRIMARY KEY, image_id INTEGER NOT NULL, created_at DATETIME, location VARCHAR)"
+        ))
+        conn.execute(text(
+            "INSERT INTO trip_to_travel.metadata (id, image_id, location) "
+            "VALUES (1, 7, 'upload'), (2, 7, 'edited'), (3, 8, 'only')"
+        ))
+
+    with pytest.raises(migrations.MigrationError, match="image_id: 7"):
+        migrations.upgrade(conn)
+    assert conn.execute(text("SELECT count(*) FROM trip_to_travel.metadata")).scalar() == 3
+
+    assert migrations.dedupe_metadata(conn) == 1
+    assert migrations.upgrade(conn) == [migrations.MIGRATIONS[-1].version]
+    assert conn.execute(text(
+        "SELECT image_id, location FROM trip_to_travel.metadata ORDER BY image_id"
+    )).all() == [(7, "edited"), (8, "only")]
+
+
+def test_upgrade_from_pre_migration_schema_matches_models(conn):
+    # 모델에 컬럼/테이블/인덱스를 추가하면 같은 커밋에 마이그레이션 단계도 있어야 함
+    legacy = MetaData(schema=metadata.schema)
+    for name, columns in PRE_MIGRATION_COLUMNS.items():
+        model = metadata.tables[f"{metadata.schema}.{name}"]
+        Table(name, legacy, *(
+            Column(column, model.c[column].type, primary_key=model.c[column].primary_key) for column in columns
+        ))
+    with conn.begin():
+        legacy.create_all(conn)
+
+    migrations.upgrade(conn)
+
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        assert inspector.has_table(table.name, schema=table.schema), table.name
+        columns = {c["name"] for c in inspector.get_columns(table.name, schema=table.schema)}
+        assert {c.name for c in table.columns} <= columns, table.name
+        indexes = migrations._index_names(conn, table)
+        expected = {index.name for index in table.indexes} | {
+            constraint.name for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        }
+        assert expected <= indexes, table.name
@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional
+from itertools import accumulate
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+FONT_PATH = os.getenv("FONT_PATH", "fonts/malgun.ttf")
+FONT_NAME = "MalgunGothic"
+
+# 줄 끝에 매달리는 공백, 줄 앞에 오면 안 되는 닫는 문장부호
+SPACES = " \t　"
+NO_BREAK_BEFORE = ".,!?;:)]}>%”’…·、。，．！？）」』】〉》"
+
+_fonts: Dict[str, TTFont] = {}
+_glyph_widths: Dict[str, "GlyphWidths"] = {}
+_font_lock = threading.Lock()
+
+
+def font_path_full(font_path: str = FONT_PATH) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), font_path)
+
+
+# TTF 파싱은 수백 ms가 걸리므로 프로세스당 한 번만 등록 (startup에서 미리 호출)
+def get_pdf_font(font_name: str = FONT_NAME, font_path: str = FONT_PATH) -> TTFont:
+    font = _fonts.get(font_name)
+    if font is not None:
+        return font
+    with _font_lock:
+        if font_name not in _fonts:
+            font = TTFont(font_name, font_path_full(font_path))
+            pdfmetrics.registerFont(font)
+            _fonts[font_name] = font
+        return _fonts[font_name]
+
+
+def load_pdf_font():
+    try:
+        get_pdf_font()
+    except Exception as e:
+        # 폰트가 없어도 서버는 뜨게 하고, 내보내기 요청에서 다시 시도/에러 처리
+        logger.warning("PDF font load failed: %s", e)
+
+
+# 글자별 advance width(1000 단위)를 캐시, 폭 계산은 글자당 dict 조회 한 번
+class GlyphWidths:
+    def __init__(self, font: TTFont):
+        self._char_widths = font.face.charWidths
+        self._default_width = font.face.defaultWidth
+        self._cache: Dict[str, float] = {}
+
+    def __getitem__(self, char: str) -> float:
+        width = self._cache.get(char)
+        if width is None:
+            width = self._cache[char] = self._char_widths.get(ord(char), self._default_width)
+        return width
+
+    def text_width(self, text: str, font_size: float) -> float:
+        return sum(self[char] for char in text) * font_size / 1000
+
+
+def get_glyph_widths(font: TTFont) -> GlyphWidths:
+    widths = _glyph_widths.get(font.fontName)
+    if widths is None:
+        widths = _glyph_widths[font.fontName] = GlyphWidths(font)
+    return widths
+
+
+def _is_cjk_ideograph(char: str) -> bool:
+    code = ord(char)
+    # 한자/가나는 글자 사이 어디서든 줄바꿈 가능, 한글은 띄어쓰기 단위(어절)로 줄바꿈
+    return 0x4E00 <= code <= 0x9FFF or 0x3040 <= code <= 0x30FF or 0x3400 <= code <= 0x4DBF
+
+
+def _can_break_before(text: str, index: int) -> bool:
+    # index 앞(text[index-1]와 text[index] 사이)에서 줄을 나눌 수 있는지
+    prev, char = text[index - 1], text[index]
+    if char in NO_BREAK_BEFORE or char in SPACES:
+        return False
+    if prev in SPACES or prev == "-":
+        return True
+    return _is_cjk_ideograph(prev) or _is_cjk_ideograph(char)
+
+
+def wrap_paragraph(text: str, widths: GlyphWidths, font_size: float, max_width: float) -> List[str]:
+    if not text:
+        return [""]
+    # 누적 폭으로 구간 폭을 O(1)에 계산, 각 글자는 최대 두 번만 훑음
+    limit = max_width * 1000 / font_size
+    cumulative = list(accumulate((widths[char] for char in text), initial=0.0))
+    length = len(text)
+    lines = []
+    start = 0
+    while start < length:
+        last_break = None
+        end = start + 1
+        while end < length and cumulative[end + 1] - cumulative[start] <= limit:
+            if _can_break_before(text, end):
+                last_break = end
+            end += 1
+        if end >= length:
+            lines.append(text[start:].rstrip(SPACES))
+            break
+        if text[end] in SPACES:
+            # 넘치는 글자가 공백이면 그 자리에서 끊고 공백은 버림
+            last_break = end
+        elif _can_break_before(text, end):
+            last_break = end
+        if last_break is None:
+            # 한 줄보다 긴 단어는 글자 단위로 자름
+            last_break = end
+        lines.append(text[start:last_break].rstrip(SPACES))
+        start = last_break
+        while start < length and text[start] in SPACES:
+            start += 1
+    return lines
+
+
+def wrap_text(text: str, font: TTFont, font_size: float, max_width: float,
+              widths: Optional[GlyphWidths] = None) -> List[str]:
+    widths = widths or get_glyph_widths(font)
+    wrapped = []
+    for paragraph in text.splitlines():
+        wrapped.extend(wrap_paragraph(paragraph, widths, font_size, max_width))
+    return wrapped